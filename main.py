@@ -17,7 +17,7 @@ st.set_page_config(page_title="EarthScape Climate Agency", layout="wide")
 
 
 def _active_dataset_ready() -> bool:
-    return st.session_state.active_df is not None
+    return st.session_state.active_frame is not None
 
 
 def _render_dataset_required_notice() -> None:
@@ -336,6 +336,52 @@ def render_users_page(user: dict) -> None:
             st.rerun()
 
 
+def render_analytics_workspace(user: dict) -> None:
+    # Lazy tabs: only the selected tab's page runs on each rerun.
+    tab_dash, tab_pred, tab_rep, tab_feed, tab_perf = st.tabs(
+        ["Dashboard", "Prediction", "Reports", "Feedback", "Performance"],
+        key="workspace_tab",
+        on_change="rerun",
+    )
+
+    if tab_dash.open:
+        with tab_dash:
+            if _active_dataset_ready():
+                dashboard.render_dashboard(
+                    st.session_state.active_frame,
+                    st.session_state.active_dataset_name or "Active Dataset",
+                    user["id"],
+                )
+            else:
+                _render_dataset_required_notice()
+
+    if tab_pred.open:
+        with tab_pred:
+            if _active_dataset_ready():
+                prediction.render_prediction_page(st.session_state.active_frame, user["id"])
+            else:
+                _render_dataset_required_notice()
+
+    if tab_rep.open:
+        with tab_rep:
+            if _active_dataset_ready():
+                reports.render_reports_page(
+                    st.session_state.active_frame,
+                    st.session_state.active_dataset_name or "active_dataset",
+                    user["id"],
+                )
+            else:
+                _render_dataset_required_notice()
+
+    if tab_feed.open:
+        with tab_feed:
+            feedback.render_feedback_page(user)
+
+    if tab_perf.open:
+        with tab_perf:
+            performance.render_performance_page(user)
+
+
 def render_datasets_page(user: dict) -> None:
     card("Datasets", "🗂️", "<p class='section-muted'>Upload, open, analyze, predict and export from one workspace.</p>")
 
@@ -349,41 +395,7 @@ def render_datasets_page(user: dict) -> None:
             dataset_manager.render_assigned_dataset_selector(user)
 
         with render_tabs[2]:
-            tab_dash, tab_pred, tab_rep, tab_feed, tab_perf = st.tabs(
-                ["Dashboard", "Prediction", "Reports", "Feedback", "Performance"]
-            )
-
-            with tab_dash:
-                if _active_dataset_ready():
-                    dashboard.render_dashboard(
-                        st.session_state.active_df,
-                        st.session_state.active_dataset_name or "Active Dataset",
-                        user["id"],
-                    )
-                else:
-                    _render_dataset_required_notice()
-
-            with tab_pred:
-                if _active_dataset_ready():
-                    prediction.render_prediction_page(st.session_state.active_df, user["id"])
-                else:
-                    _render_dataset_required_notice()
-
-            with tab_rep:
-                if _active_dataset_ready():
-                    reports.render_reports_page(
-                        st.session_state.active_df,
-                        st.session_state.active_dataset_name or "active_dataset",
-                        user["id"],
-                    )
-                else:
-                    _render_dataset_required_notice()
-
-            with tab_feed:
-                feedback.render_feedback_page(user)
-
-            with tab_perf:
-                performance.render_performance_page(user)
+            render_analytics_workspace(user)
 
         with render_tabs[3]:
             dataset_manager.render_dataset_access_overview(user)
@@ -395,41 +407,7 @@ def render_datasets_page(user: dict) -> None:
             dataset_manager.render_assigned_dataset_selector(user)
 
         with render_tabs[1]:
-            tab_dash, tab_pred, tab_rep, tab_feed, tab_perf = st.tabs(
-                ["Dashboard", "Prediction", "Reports", "Feedback", "Performance"]
-            )
-
-            with tab_dash:
-                if _active_dataset_ready():
-                    dashboard.render_dashboard(
-                        st.session_state.active_df,
-                        st.session_state.active_dataset_name or "Active Dataset",
-                        user["id"],
-                    )
-                else:
-                    _render_dataset_required_notice()
-
-            with tab_pred:
-                if _active_dataset_ready():
-                    prediction.render_prediction_page(st.session_state.active_df, user["id"])
-                else:
-                    _render_dataset_required_notice()
-
-            with tab_rep:
-                if _active_dataset_ready():
-                    reports.render_reports_page(
-                        st.session_state.active_df,
-                        st.session_state.active_dataset_name or "active_dataset",
-                        user["id"],
-                    )
-                else:
-                    _render_dataset_required_notice()
-
-            with tab_feed:
-                feedback.render_feedback_page(user)
-
-            with tab_perf:
-                performance.render_performance_page(user)
+            render_analytics_workspace(user)
 
 
 def render_logout_page() -> None:
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+
+MEASURES = ["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
+CUBE_STATS = ["sum", "count", "min", "max", "sumsq"]
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    # One row per (Year, Month); columns are (stat, measure). Pass full-precision measures
+    # (see build_clean_frame): float32 input would show up as 14.199999809265137 in reports.
+    values = df[MEASURES].astype("float64")
+    keys = [df["Year"].astype("int64"), df["Month"].astype("int64")]
+    grouped = values.groupby(keys, sort=True)
+    cube = pd.concat(
+        {
+            "sum": grouped.sum(),
+            "count": grouped.count(),
+            "min": grouped.min(),
+            "max": grouped.max(),
+            "sumsq": (values * values).groupby(keys, sort=True).sum(),
+        },
+        axis=1,
+    )
+    cube.index.names = ["Year", "Month"]
+    return cube
+
+
+def slice_years(cube: pd.DataFrame, year_from: int, year_to: int) -> pd.DataFrame:
+    years = cube.index.get_level_values("Year")
+    return cube[(years >= year_from) & (years <= year_to)]
+
+
+def year_bounds(cube: pd.DataFrame) -> tuple[int, int]:
+    years = cube.index.get_level_values("Year")
+    return int(years.min()), int(years.max())
+
+
+def row_count(cube: pd.DataFrame) -> int:
+    if cube.empty:
+        return 0
+    return int(cube["count"][MEASURES[0]].sum())
+
+
+def monthly_means(cube: pd.DataFrame) -> pd.DataFrame:
+    means = cube["sum"] / cube["count"]
+    return means[MEASURES].reset_index()
+
+
+def summary_stats(cube: pd.DataFrame) -> pd.DataFrame:
+    # Index: measure; columns: count, mean, std (population), min, max.
+    count = cube["count"].sum()
+    total = cube["sum"].sum()
+    mean = total / count
+    var = (cube["sumsq"].sum() / count - mean * mean).clip(lower=0.0)
+    return pd.DataFrame(
+        {
+            "count": count,
+            "mean": mean,
+            "std": np.sqrt(var),
+            "min": cube["min"].min(),
+            "max": cube["max"].max(),
+        }
+    ).loc[MEASURES]
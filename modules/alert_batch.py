@@ -0,0 +1,217 @@
+"""Batch alert snapshots for every saved dataset.
+
+Run from the project root, e.g. nightly from cron:
+
+    python -m modules.alert_batch --workers 4
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from io import StringIO
+from time import perf_counter
+from typing import Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from . import database
+from . import risk
+from .anomalies import DEFAULT_DETECTOR, DEFAULT_Z_THRESHOLD, DETECTORS, run_detector
+from .clean_frame import build_clean_frame
+from .columnar import decode_frame
+
+
+@dataclass(frozen=True)
+class AlertRules:
+    # Defaults match the dashboard's Anomalies & Alerts panel.
+    detector: str = DEFAULT_DETECTOR
+    detector_param: Optional[int] = None
+    temp_thresh: float = DEFAULT_Z_THRESHOLD
+    rain_thresh: float = DEFAULT_Z_THRESHOLD
+    co2_thresh: float = DEFAULT_Z_THRESHOLD
+    humidity_thresh: float = DEFAULT_Z_THRESHOLD
+    wind_thresh: float = DEFAULT_Z_THRESHOLD
+    heatwave_threshold: float = risk.RISK_TYPES["heatwave"].default_threshold
+    flood_threshold: float = risk.RISK_TYPES["flood"].default_threshold
+    min_run_months: int = risk.EVENT_MIN_MONTHS
+
+
+@dataclass(frozen=True)
+class DatasetPayload:
+    dataset_id: int
+    dataset_name: str
+    columns: list
+    raw_csv_text: str
+
+
+def _load_payloads() -> Iterator[DatasetPayload]:
+    # Only the parent touches the database; workers receive column blobs and return counts.
+    for row in database.list_datasets_for_admin():
+        full_row = database.get_dataset_by_id(row["id"])
+        if full_row is None:
+            continue
+        columns = [
+            (r["position"], r["column_name"], r["dtype"], bytes(r["data"]))
+            for r in database.list_dataset_columns(row["id"])
+        ]
+        yield DatasetPayload(
+            dataset_id=full_row["id"],
+            dataset_name=full_row["dataset_name"],
+            columns=columns,
+            raw_csv_text="" if columns else full_row["raw_csv_text"] or "",
+        )
+
+
+def _exceedances(df: pd.DataFrame, risk_type: risk.RiskType, threshold: float) -> int:
+    # One threshold per risk, so a single comparison pass beats sorting the column.
+    values = df[risk_type.column].to_numpy()
+    return int(np.count_nonzero(risk.risk_flags(values, risk_type, threshold)))
+
+
+def evaluate_dataset(payload: DatasetPayload, rules: AlertRules) -> dict:
+    if payload.columns:
+        df = decode_frame(
+            [
+                {"position": position, "column_name": name, "dtype": dtype, "data": data}
+                for position, name, dtype, data in payload.columns
+            ]
+        )
+    else:
+        # Legacy datasets saved before columnar storage.
+        from .dataset_manager import ingest_csv_stream
+
+        df, errors = ingest_csv_stream(StringIO(payload.raw_csv_text))
+        if errors or df is None:
+            raise ValueError("; ".join(errors) or "Dataset could not be cleaned.")
+
+    frame = build_clean_frame(df)
+    if not frame.valid:
+        raise ValueError("Dataset has no valid rows.")
+
+    thresholds = {
+        "Temperature": rules.temp_thresh,
+        "Rainfall": rules.rain_thresh,
+        "CO2": rules.co2_thresh,
+        "Humidity": rules.humidity_thresh,
+        "WindSpeed": rules.wind_thresh,
+    }
+    anomaly_count = int(
+        run_detector(frame.df, rules.detector, rules.detector_param).mask(thresholds).sum()
+    )
+    heatwave, flood = risk.RISK_TYPES["heatwave"], risk.RISK_TYPES["flood"]
+    heatwave_count = _exceedances(frame.df, heatwave, rules.heatwave_threshold)
+    flood_count = _exceedances(frame.df, flood, rules.flood_threshold)
+    heatwave_runs = len(
+        risk.detect_events(frame.cube, heatwave, rules.heatwave_threshold, rules.min_run_months)
+    )
+    flood_runs = len(
+        risk.detect_events(frame.cube, flood, rules.flood_threshold, rules.min_run_months)
+    )
+
+    summary_text = (
+        f"Batch | Detector={DETECTORS[rules.detector].label} | Anomalies={anomaly_count}"
+        f" | Heatwave={heatwave_count} | Flood={flood_count}"
+        f" | HeatwaveRuns={heatwave_runs} | FloodRuns={flood_runs}"
+    )
+    return {
+        "dataset_id": payload.dataset_id,
+        "dataset_name": payload.dataset_name,
+        "user_id": None,
+        "summary_text": summary_text,
+        "temp_thresh": rules.temp_thresh,
+        "rain_thresh": rules.rain_thresh,
+        "co2_thresh": rules.co2_thresh,
+        "humidity_thresh": rules.humidity_thresh,
+        "wind_thresh": rules.wind_thresh,
+        "heatwave_threshold": rules.heatwave_threshold,
+        "flood_threshold": rules.flood_threshold,
+        "anomaly_count": anomaly_count,
+        "heatwave_count": heatwave_count,
+        "flood_count": flood_count,
+    }
+
+
+def run_batch(rules: AlertRules, workers: Optional[int] = None) -> tuple[int, list[str]]:
+    """Scan every saved dataset and bulk-insert one alert snapshot per dataset.
+
+    Returns (snapshots written, error messages). ``workers=1`` runs in-process.
+    """
+    start = perf_counter()
+    workers = workers or os.cpu_count() or 1
+    snapshots, errors = [], []
+
+    if workers == 1:
+        for payload in _load_payloads():
+            try:
+                snapshots.append(evaluate_dataset(payload, rules))
+            except Exception as ex:
+                errors.append(f"[{payload.dataset_id}] {payload.dataset_name}: {ex}")
+    else:
+        # Bounded submission keeps at most 2 * workers datasets in memory at once.
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = {}
+            payloads = _load_payloads()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < workers * 2:
+                    payload = next(payloads, None)
+                    if payload is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(evaluate_dataset, payload, rules)] = payload
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    payload = pending.pop(future)
+                    try:
+                        snapshots.append(future.result())
+                    except Exception as ex:
+                        errors.append(f"[{payload.dataset_id}] {payload.dataset_name}: {ex}")
+
+    snapshots.sort(key=lambda s: s["dataset_id"])
+    written = database.insert_alert_snapshots(snapshots)
+    database.log_performance(None, "batch_alert_snapshots", (perf_counter() - start) * 1000)
+    database.flush_performance_logs()
+    return written, errors
+
+
+def _parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    defaults = AlertRules()
+    parser = argparse.ArgumentParser(description="Write alert snapshots for every saved dataset.")
+    parser.add_argument("--db", help="Database URL or SQLite path (default: EARTHSCAPE_DB_URL or earthscape.db).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count; 1 = in-process).")
+    parser.add_argument("--detector", choices=list(DETECTORS), default=defaults.detector)
+    parser.add_argument("--detector-param", type=int, default=None, help="Window/span for detectors that take one.")
+    parser.add_argument("--temp-thresh", type=float, default=defaults.temp_thresh)
+    parser.add_argument("--rain-thresh", type=float, default=defaults.rain_thresh)
+    parser.add_argument("--co2-thresh", type=float, default=defaults.co2_thresh)
+    parser.add_argument("--humidity-thresh", type=float, default=defaults.humidity_thresh)
+    parser.add_argument("--wind-thresh", type=float, default=defaults.wind_thresh)
+    parser.add_argument("--heatwave-threshold", type=float, default=defaults.heatwave_threshold)
+    parser.add_argument("--flood-threshold", type=float, default=defaults.flood_threshold)
+    parser.add_argument("--min-run-months", type=int, default=defaults.min_run_months)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.db:
+        os.environ["EARTHSCAPE_DB_URL"] = args.db
+    database.init_db()
+
+    rule_fields = set(asdict(AlertRules()))
+    rules = AlertRules(**{k: v for k, v in vars(args).items() if k in rule_fields})
+    written, errors = run_batch(rules, workers=args.workers)
+
+    print(f"Wrote {written} alert snapshot(s).")
+    for error in errors:
+        print(f"Skipped {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+ANOMALY_COLUMNS = ["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
+DEFAULT_Z_THRESHOLD = 2.0
+
+
+@dataclass
+class ColumnStats:
+    """Running count/mean/M2 (Welford) for one column; std is the population std."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @property
+    def std(self) -> float:
+        if self.count == 0:
+            return 0.0
+        return float(np.sqrt(self.m2 / self.count))
+
+    def update(self, values: np.ndarray) -> "ColumnStats":
+        # Welford's update generalized to a batch (Chan et al.): merge the batch's own
+        # count/mean/M2 into the running totals without revisiting earlier rows.
+        values = np.asarray(values, dtype="float64")
+        n = len(values)
+        if n == 0:
+            return self
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.count + n
+        delta = batch_mean - self.mean
+        return ColumnStats(
+            count=total,
+            mean=self.mean + delta * n / total,
+            m2=self.m2 + batch_m2 + delta * delta * self.count * n / total,
+        )
+
+
+class AnomalyScores:
+    """Per-column z-like scores aligned with the rows of the frame they were computed on."""
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def z(self, col: str) -> np.ndarray:
+        raise NotImplementedError
+
+    def mask(self, thresholds: dict[str, float]) -> np.ndarray:
+        mask = np.zeros(len(self), dtype=bool)
+        for col in ANOMALY_COLUMNS:
+            mask |= np.abs(self.z(col)) > thresholds.get(col, DEFAULT_Z_THRESHOLD)
+        return mask
+
+    def flagged(self, df: pd.DataFrame, thresholds: dict[str, float]) -> pd.DataFrame:
+        # df must be the frame (same rows, same order) the scores were computed on.
+        mask = self.mask(thresholds)
+        flagged = df[mask].copy()
+        for col in ANOMALY_COLUMNS:
+            flagged[f"{col}_z"] = self.z(col)[mask]
+        return flagged
+
+
+@dataclass
+class ZScoreIndex(AnomalyScores):
+    """Cached column statistics and z-score arrays for one frame.
+
+    Re-thresholding is a boolean mask over the cached arrays; appending rows merges
+    the new rows into the statistics and only the z arrays are recomputed.
+    """
+
+    values: dict[str, np.ndarray]
+    stats: dict[str, ColumnStats]
+    _z: dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ZScoreIndex":
+        values = {col: df[col].to_numpy() for col in ANOMALY_COLUMNS}
+        stats = {col: ColumnStats().update(arr) for col, arr in values.items()}
+        return cls(values=values, stats=stats)
+
+    def __len__(self) -> int:
+        return len(self.values[ANOMALY_COLUMNS[0]])
+
+    def append(self, df: pd.DataFrame) -> "ZScoreIndex":
+        values, stats = {}, {}
+        for col in ANOMALY_COLUMNS:
+            new = df[col].to_numpy()
+            values[col] = np.concatenate([self.values[col], new])
+            stats[col] = self.stats[col].update(new)
+        return ZScoreIndex(values=values, stats=stats)
+
+    def z(self, col: str) -> np.ndarray:
+        cached = self._z.get(col)
+        if cached is None:
+            stats = self.stats[col]
+            values = self.values[col]
+            if stats.std == 0:
+                cached = np.zeros(len(values), dtype="float32")
+            else:
+                cached = ((values - stats.mean) / stats.std).astype("float32")
+            cached.flags.writeable = False
+            self._z[col] = cached
+        return cached
+
+
+@dataclass
+class DetectorScores(AnomalyScores):
+    scores: dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.scores[ANOMALY_COLUMNS[0]])
+
+    def z(self, col: str) -> np.ndarray:
+        return self.scores[col]
+
+
+def _finish(z: np.ndarray) -> np.ndarray:
+    z = np.nan_to_num(z, nan=0.0, posinf=0.0, neginf=0.0).astype("float32")
+    z.flags.writeable = False
+    return z
+
+
+def _time_order(df: pd.DataFrame) -> np.ndarray:
+    # Stable (Year, Month) order; rolling and streaming detectors walk rows in time.
+    return np.lexsort((df["Month"].to_numpy(), df["Year"].to_numpy()))
+
+
+def _unsort(sorted_values: np.ndarray, order: np.ndarray) -> np.ndarray:
+    values = np.empty_like(sorted_values)
+    values[order] = sorted_values
+    return values
+
+
+def monthly_climatology_scores(df: pd.DataFrame) -> DetectorScores:
+    # z against the mean/std of the same calendar month, so seasonality is not an anomaly.
+    months = df["Month"].to_numpy().astype(np.intp)
+    counts = np.maximum(np.bincount(months, minlength=13), 1)
+    scores = {}
+    for col in ANOMALY_COLUMNS:
+        values = df[col].to_numpy(dtype="float64")
+        means = np.bincount(months, weights=values, minlength=13) / counts
+        dev = values - means[months]
+        stds = np.sqrt(np.bincount(months, weights=dev * dev, minlength=13) / counts)
+        row_std = stds[months]
+        scores[col] = _finish(np.divide(dev, row_std, out=np.zeros_like(dev), where=row_std > 0))
+    return DetectorScores(scores=scores)
+
+
+def _window_median(blocks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    median = np.median(blocks, axis=1)
+    mad = np.median(np.abs(blocks - median[:, None]), axis=1) * 1.4826
+    return median, mad
+
+
+def rolling_robust_scores(df: pd.DataFrame, window: int = 24) -> DetectorScores:
+    # Robust z = (x - median) / (1.4826 * MAD) over consecutive windows of `window` rows in
+    # time order. Non-overlapping windows keep it O(n) (np.median partitions each window);
+    # a sliding median would cost O(n log window). A short tail reuses the last full window.
+    order = _time_order(df)
+    n = len(order)
+    window = max(1, min(window, n))
+    full = n - n % window
+    scores = {}
+    for col in ANOMALY_COLUMNS:
+        values = df[col].to_numpy(dtype="float64")[order]
+        median = np.empty(n)
+        mad = np.empty(n)
+        if full:
+            block_median, block_mad = _window_median(values[:full].reshape(-1, window))
+            median[:full] = np.repeat(block_median, window)
+            mad[:full] = np.repeat(block_mad, window)
+        if full < n:
+            tail_median, tail_mad = _window_median(values[-window:].reshape(1, -1))
+            median[full:] = tail_median[0]
+            mad[full:] = tail_mad[0]
+        deviation = values - median
+        z = np.divide(deviation, mad, out=np.zeros(n), where=mad > 0)
+        scores[col] = _finish(_unsort(z, order))
+    return DetectorScores(scores=scores)
+
+
+def ewma_scores(df: pd.DataFrame, span: int = 12) -> DetectorScores:
+    # Streaming detector: each row is scored against the exponentially weighted mean and
+    # variance of the rows before it; the first span-1 rows only warm the filter up.
+    order = _time_order(df)
+    scores = {}
+    for col in ANOMALY_COLUMNS:
+        series = pd.Series(df[col].to_numpy(dtype="float64")[order])
+        ewm = series.ewm(span=span, adjust=False, min_periods=span)
+        mean = ewm.mean().shift(1).to_numpy()
+        std = np.sqrt(ewm.var(bias=True).shift(1).to_numpy())
+        z = np.divide(series.to_numpy() - mean, std, out=np.zeros(len(series)), where=std > 0)
+        scores[col] = _finish(_unsort(z, order))
+    return DetectorScores(scores=scores)
+
+
+@dataclass(frozen=True)
+class Detector:
+    label: str
+    score: Callable[..., AnomalyScores]
+    param: str | None = None
+    param_label: str = ""
+    param_default: int = 0
+    param_range: tuple[int, int] = (0, 0)
+
+
+DETECTORS = {
+    "global_z": Detector("Global z-score", ZScoreIndex.from_frame),
+    "monthly_climatology": Detector("Per-month climatology z-score", monthly_climatology_scores),
+    "rolling_robust": Detector(
+        "Windowed robust z (median/MAD)",
+        rolling_robust_scores,
+        param="window",
+        param_label="Window (rows)",
+        param_default=24,
+        param_range=(3, 240),
+    ),
+    "ewma": Detector(
+        "Exponentially weighted (streaming)",
+        ewma_scores,
+        param="span",
+        param_label="EWMA span (rows)",
+        param_default=12,
+        param_range=(2, 120),
+    ),
+}
+DEFAULT_DETECTOR = "global_z"
+
+
+def run_detector(df: pd.DataFrame, name: str, param: int | None = None) -> AnomalyScores:
+    detector = DETECTORS[name]
+    if detector.param is None or param is None:
+        return detector.score(df)
+    return detector.score(df, **{detector.param: param})
+
+
+def zscore_thresholds(
+    temp_thresh: float = DEFAULT_Z_THRESHOLD,
+    rain_thresh: float = DEFAULT_Z_THRESHOLD,
+    co2_thresh: float = DEFAULT_Z_THRESHOLD,
+) -> dict[str, float]:
+    return {
+        "Temperature": temp_thresh,
+        "Rainfall": rain_thresh,
+        "CO2": co2_thresh,
+        "Humidity": DEFAULT_Z_THRESHOLD,
+        "WindSpeed": DEFAULT_Z_THRESHOLD,
+    }
@@ -72,16 +72,17 @@ def logout() -> None:
     for key in [
         "logged_in",
         "user",
-        "active_df",
+        "active_frame",
         "active_dataset_id",
         "active_dataset_name",
         "active_dataset_source",
-        "last_upload_csv_text",
+        "last_upload_frame",
         "last_upload_dataset_name",
         "model",
         "model_metrics",
         "model_feature_defaults",
-        "model_dataset_signature",
+        "model_dataset_fingerprint",
+        "batch_prediction",
     ]:
         st.session_state[key] = None
     st.session_state.username = None
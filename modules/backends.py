@@ -0,0 +1,296 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional
+
+try:
+    import psycopg
+    from psycopg.rows import dict_row
+except Exception:
+    psycopg = None
+    dict_row = None
+
+
+Row = Mapping[str, Any]
+
+# Connection settings, overridable per deployment through environment variables.
+SQLITE_SETTINGS = {
+    "journal_mode": os.environ.get("EARTHSCAPE_SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.environ.get("EARTHSCAPE_SQLITE_SYNCHRONOUS", "NORMAL"),
+    # Negative cache_size is in KiB (-16000 ~= 16 MB of page cache per connection).
+    "cache_size": int(os.environ.get("EARTHSCAPE_SQLITE_CACHE_SIZE", "-16000")),
+    "mmap_size": int(os.environ.get("EARTHSCAPE_SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+    "busy_timeout_ms": int(os.environ.get("EARTHSCAPE_SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+# Idle connections kept per backend; a burst beyond this opens extra connections that are
+# closed when returned.
+DB_POOL_SIZE = int(os.environ.get("EARTHSCAPE_DB_POOL_SIZE", "8"))
+
+
+class BackendConnection:
+    """DB-API connection wrapper that speaks the app's SQLite-flavoured SQL on any backend."""
+
+    def __init__(self, backend: "StorageBackend", raw) -> None:
+        self.backend = backend
+        self.raw = raw
+
+    def execute(self, sql: str, params: Iterable = ()):
+        return self.raw.execute(self.backend.translate(sql), tuple(params))
+
+    def executemany(self, sql: str, seq_of_params: Iterable):
+        cur = self.raw.cursor()
+        cur.executemany(self.backend.translate(sql), seq_of_params)
+        return cur
+
+    def insert_returning_id(self, sql: str, params: Iterable = ()) -> int:
+        return self.backend.insert_returning_id(self, sql, params)
+
+    def begin_exclusive(self) -> None:
+        self.backend.begin_exclusive(self)
+
+    def table_columns(self, table: str) -> set[str]:
+        return self.backend.table_columns(self, table)
+
+    def full_scans(self, sql: str, params: Iterable = ()) -> list[str]:
+        return self.backend.full_scans(self, sql, params)
+
+    def commit(self) -> None:
+        self.raw.commit()
+
+    def rollback(self) -> None:
+        self.raw.rollback()
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+class StorageBackend:
+    name = "base"
+    errors: tuple = (Exception,)
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self._idle: "queue.LifoQueue[BackendConnection]" = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+    def open(self):
+        raise NotImplementedError
+
+    def translate(self, sql: str) -> str:
+        return sql
+
+    def insert_returning_id(self, conn: BackendConnection, sql: str, params: Iterable) -> int:
+        raise NotImplementedError
+
+    def begin_exclusive(self, conn: BackendConnection) -> None:
+        raise NotImplementedError
+
+    def table_columns(self, conn: BackendConnection, table: str) -> set[str]:
+        raise NotImplementedError
+
+    def full_scans(self, conn: BackendConnection, sql: str, params: Iterable) -> list[str]:
+        raise NotImplementedError
+
+    def acquire(self) -> BackendConnection:
+        # Process-wide pool rather than per-thread connections: Streamlit starts a new script
+        # thread on every rerun, so a thread-local connection would be reopened each rerun.
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return BackendConnection(self, self.open())
+
+    def release(self, conn: BackendConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_idle(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+    errors = (sqlite3.Error,)
+
+    def __init__(self, url: str, path: str) -> None:
+        super().__init__(url)
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        # Pooled connections move between threads, but only one thread holds each at a time.
+        return sqlite3.connect(
+            self.path,
+            timeout=SQLITE_SETTINGS["busy_timeout_ms"] / 1000,
+            check_same_thread=False,
+        )
+
+    def _journal_mode(self) -> str:
+        return SQLITE_SETTINGS["journal_mode"]
+
+    def open(self) -> sqlite3.Connection:
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA journal_mode = {self._journal_mode()};")
+        conn.execute(f"PRAGMA synchronous = {SQLITE_SETTINGS['synchronous']};")
+        conn.execute(f"PRAGMA cache_size = {int(SQLITE_SETTINGS['cache_size'])};")
+        conn.execute(f"PRAGMA mmap_size = {int(SQLITE_SETTINGS['mmap_size'])};")
+        conn.execute(f"PRAGMA busy_timeout = {int(SQLITE_SETTINGS['busy_timeout_ms'])};")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    def insert_returning_id(self, conn: BackendConnection, sql: str, params: Iterable) -> int:
+        return conn.execute(sql, params).lastrowid
+
+    def begin_exclusive(self, conn: BackendConnection) -> None:
+        conn.execute("BEGIN IMMEDIATE")
+
+    def table_columns(self, conn: BackendConnection, table: str) -> set[str]:
+        return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+    def full_scans(self, conn: BackendConnection, sql: str, params: Iterable) -> list[str]:
+        details = [
+            row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        ]
+        # "SCAN t USING [COVERING] INDEX ..." is accepted on purpose: the ORDER BY ... LIMIT
+        # listings (performance logs, recent alerts) walk an index in sort order and stop
+        # after LIMIT rows, which is the intended plan. Only bare "SCAN t" is a full scan.
+        return [d for d in details if d.startswith("SCAN") and "INDEX" not in d]
+
+
+class MemoryBackend(SQLiteBackend):
+    """In-process stand-in for a shared database server, backed by one in-memory SQLite database.
+
+    All access is serialized through a single connection: shared-cache in-memory SQLite takes
+    table-level locks that fail immediately ("database table is locked") instead of waiting
+    on busy_timeout, so concurrent connections are not an option.
+    """
+
+    name = "memory"
+
+    def __init__(self, url: str, db_name: str) -> None:
+        super().__init__(url, ":memory:")
+        self.db_name = db_name
+        # The database lives exactly as long as this connection.
+        self._conn = BackendConnection(self, self.open())
+        self._lock = threading.RLock()
+
+    def _journal_mode(self) -> str:
+        return "MEMORY"
+
+    def acquire(self) -> BackendConnection:
+        self._lock.acquire()
+        return self._conn
+
+    def release(self, conn: BackendConnection) -> None:
+        self._lock.release()
+
+    def close_idle(self) -> None:
+        # Closing the only connection would drop the database.
+        return
+
+
+_INSERT_OR_IGNORE = re.compile(r"INSERT\s+OR\s+IGNORE\s+INTO", re.IGNORECASE)
+_DDL_TYPES = [
+    (re.compile(r"INTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT", re.IGNORECASE), "BIGSERIAL PRIMARY KEY"),
+    (re.compile(r"\bBLOB\b", re.IGNORECASE), "BYTEA"),
+    (re.compile(r"\bREAL\b", re.IGNORECASE), "DOUBLE PRECISION"),
+]
+
+
+class PostgresBackend(StorageBackend):
+    """Multi-writer backend for replicated deployments (requires the optional psycopg package)."""
+
+    name = "postgresql"
+
+    def __init__(self, url: str) -> None:
+        if psycopg is None:
+            raise RuntimeError("PostgreSQL backend requires the 'psycopg' package.")
+        super().__init__(url)
+        self.errors = (psycopg.Error,)
+
+    def open(self):
+        return psycopg.connect(self.url, row_factory=dict_row)
+
+    def translate(self, sql: str) -> str:
+        return _translate_postgres(sql)
+
+    def insert_returning_id(self, conn: BackendConnection, sql: str, params: Iterable) -> int:
+        return conn.execute(f"{sql.rstrip().rstrip(';')} RETURNING id", params).fetchone()["id"]
+
+    def begin_exclusive(self, conn: BackendConnection) -> None:
+        # Transaction-scoped advisory lock serializes schema migrations across replicas.
+        conn.execute("SELECT pg_advisory_xact_lock(?)", (7_274_001,))
+
+    def table_columns(self, conn: BackendConnection, table: str) -> set[str]:
+        rows = conn.execute(
+            """
+            SELECT column_name
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = ?
+            """,
+            (table,),
+        ).fetchall()
+        return {row["column_name"] for row in rows}
+
+    def full_scans(self, conn: BackendConnection, sql: str, params: Iterable) -> list[str]:
+        # EXPLAIN cannot take server-side parameters, so bind them on the client.
+        cur = psycopg.ClientCursor(conn.raw)
+        cur.execute(f"EXPLAIN {self.translate(sql)}", tuple(params))
+        lines = [next(iter(row.values())) for row in cur.fetchall()]
+        return [line.strip() for line in lines if "Seq Scan" in line]
+
+
+@lru_cache(maxsize=512)
+def _translate_postgres(sql: str) -> str:
+    if _INSERT_OR_IGNORE.search(sql):
+        sql = _INSERT_OR_IGNORE.sub("INSERT INTO", sql).rstrip().rstrip(";") + " ON CONFLICT DO NOTHING"
+    if sql.lstrip().upper().startswith(("CREATE", "ALTER")):
+        for pattern, replacement in _DDL_TYPES:
+            sql = pattern.sub(replacement, sql)
+    return sql.replace("%", "%%").replace("?", "%s")
+
+
+_backends: dict[str, StorageBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def backend_from_url(url: str) -> StorageBackend:
+    with _backends_lock:
+        backend = _backends.get(url)
+        if backend is None:
+            backend = _create_backend(url)
+            _backends[url] = backend
+        return backend
+
+
+def _create_backend(url: str) -> StorageBackend:
+    if url.startswith(("postgresql://", "postgres://")):
+        return PostgresBackend(url)
+    if url.startswith("memory://"):
+        return MemoryBackend(url, url[len("memory://"):] or "earthscape")
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url, url[len("sqlite:///"):])
+    # Anything else is treated as a plain SQLite file path.
+    return SQLiteBackend(url, url)
+
+
+def close_connections() -> None:
+    with _backends_lock:
+        backends = list(_backends.values())
+    for backend in backends:
+        backend.close_idle()
+
+
+def resolve_backend(db_path: Optional[str], default_path: str) -> StorageBackend:
+    # An explicit path wins; otherwise EARTHSCAPE_DB_URL selects the backend, defaulting to SQLite.
+    if db_path is None:
+        db_path = os.environ.get("EARTHSCAPE_DB_URL") or default_path
+    return backend_from_url(db_path)
@@ -0,0 +1,75 @@
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from .aggregates import MEASURES
+
+
+CHART_MAX_POINTS = 600
+CHART_COLORS = {
+    "Temperature": "#e76f51",
+    "Rainfall": "#2a9d8f",
+    "CO2": "#264653",
+    "Humidity": "#3f72af",
+    "WindSpeed": "#f4a261",
+}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: keep the first and last point, then from each bucket
+    # the point forming the largest triangle with the previous pick and the next bucket's mean.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    prev = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = x[end : edges[bucket + 2]].mean()
+            next_y = y[end : edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[prev] - next_x) * (by - y[prev]) - (x[prev] - bx) * (next_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[bucket + 1] = prev
+    return selected
+
+
+def _time_axis(monthly: pd.DataFrame) -> np.ndarray:
+    # Fractional years keep the x axis numeric; string date keys make one tick per point.
+    return monthly["Year"].to_numpy(dtype="float64") + (monthly["Month"].to_numpy() - 1) / 12.0
+
+
+def downsample_series(monthly: pd.DataFrame, max_points: int = CHART_MAX_POINTS) -> dict[str, pd.DataFrame]:
+    x = _time_axis(monthly)
+    series = {}
+    for measure in MEASURES:
+        y = monthly[measure].to_numpy(dtype="float64")
+        keep = lttb_indices(x, y, max_points)
+        series[measure] = pd.DataFrame({"Year": x[keep], measure: y[keep]}).set_index("Year")
+    return series
+
+
+def render_trend_png(series: dict[str, pd.DataFrame]) -> bytes:
+    # Figure objects (not pyplot) are not tracked globally, so nothing leaks between reruns.
+    fig = Figure(figsize=(10, 14))
+    axes = fig.subplots(len(MEASURES), 1, sharex=True)
+    for ax, measure in zip(axes, MEASURES):
+        frame = series[measure]
+        ax.plot(frame.index.to_numpy(), frame[measure].to_numpy(), color=CHART_COLORS[measure], linewidth=1.2)
+        ax.set_title(f"{measure} Trend")
+        ax.set_ylabel(measure)
+        ax.grid(alpha=0.2)
+    axes[-1].set_xlabel("Year")
+    fig.tight_layout()
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", dpi=100)
+    return buffer.getvalue()
@@ -0,0 +1,199 @@
+import dataclasses
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+from . import aggregates
+from .columnar import frame_fingerprint
+from .utils import REQUIRED_COLUMNS
+
+
+CLEAN_DTYPES = {
+    "Year": "int16",
+    "Month": "int8",
+    "Temperature": "float32",
+    "Rainfall": "float32",
+    "CO2": "float32",
+    "Humidity": "float32",
+    "WindSpeed": "float32",
+}
+# Byte budget for the derived results (scores, preview orders, charts, ...) memoized per
+# clean frame; least recently used entries are evicted first. Kept results are exempt.
+DERIVED_MAX_BYTES = int(os.environ.get("EARTHSCAPE_DERIVED_MAX_BYTES", str(64 * 1024 * 1024)))
+_MISSING = object()
+
+
+def estimate_nbytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        return int(np.sum(value.memory_usage(index=True, deep=True)))
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(v) for v in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(estimate_nbytes(getattr(value, f.name)) for f in dataclasses.fields(value))
+    return sys.getsizeof(value)
+
+
+@dataclass(frozen=True)
+class CleanFrame:
+    """Typed, read-only view of a loaded dataset shared by every page and session.
+
+    ``df`` holds compact float32 measures for in-memory work only; ``cube`` is aggregated from
+    the full-precision input. ``fingerprint`` is the SHA-256 of the full-precision columns,
+    computed once when the frame is built; it equals the saved blob's content hash and is the
+    cache key for anything derived from the data.
+    """
+
+    df: pd.DataFrame
+    valid: bool
+    cube: pd.DataFrame
+    fingerprint: str
+    # key -> (value, nbytes); _kept holds expensive results that cheap entries cannot evict.
+    _derived: OrderedDict = field(default_factory=OrderedDict, init=False, repr=False, compare=False)
+    _kept: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _growth_listeners: list = field(default_factory=list, init=False, repr=False, compare=False)
+    _derived_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    @property
+    def row_count(self) -> int:
+        return len(self.df)
+
+    def year_bounds(self) -> tuple[int, int]:
+        return aggregates.year_bounds(self.cube)
+
+    def year_slice(self, year_from: int, year_to: int) -> pd.DataFrame:
+        years = self.df["Year"].to_numpy()
+        mask = (years >= year_from) & (years <= year_to)
+        if mask.all():
+            return self.df
+        return self.df[mask]
+
+    def cube_slice(self, year_from: int, year_to: int) -> pd.DataFrame:
+        return aggregates.slice_years(self.cube, year_from, year_to)
+
+    @property
+    def derived_bytes(self) -> int:
+        with self._derived_lock:
+            return sum(nbytes for _, nbytes in self._derived.values()) + sum(
+                nbytes for _, nbytes in self._kept.values()
+            )
+
+    def on_derived_growth(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` after each new derived result, e.g. to re-check a cache budget."""
+        with self._derived_lock:
+            if callback not in self._growth_listeners:
+                self._growth_listeners.append(callback)
+
+    def _memoized(self, key: Hashable) -> Any:
+        with self._derived_lock:
+            if key in self._kept:
+                return self._kept[key][0]
+            if key not in self._derived:
+                return _MISSING
+            self._derived.move_to_end(key)
+            return self._derived[key][0]
+
+    def peek_derived(self, key: Hashable) -> Any:
+        """The memoized result for ``key``, or None if it has not been built yet."""
+        value = self._memoized(key)
+        return None if value is _MISSING else value
+
+    def derived(self, key: Hashable, build: Callable[[], Any], keep: bool = False) -> Any:
+        # The frame is immutable, so anything computed from it can be shared by every
+        # session holding it and is dropped together with the frame. ``keep`` is for results
+        # that are slow to rebuild (the model leaderboard) and must outlive slider drags.
+        value = self._memoized(key)
+        if value is not _MISSING:
+            return value
+        value = build()
+        nbytes = estimate_nbytes(value)
+        with self._derived_lock:
+            listeners = list(self._growth_listeners)
+            if keep:
+                self._kept[key] = (value, nbytes)
+            elif nbytes <= DERIVED_MAX_BYTES:
+                self._derived[key] = (value, nbytes)
+                self._derived.move_to_end(key)
+                total = sum(size for _, size in self._derived.values())
+                while total > DERIVED_MAX_BYTES:
+                    _, (_, evicted) = self._derived.popitem(last=False)
+                    total -= evicted
+        for listener in listeners:
+            listener()
+        return value
+
+def _fits(values: np.ndarray, dtype: str) -> bool:
+    if len(values) == 0:
+        return True
+    target = np.dtype(dtype)
+    info = np.iinfo(target) if target.kind in "iu" else np.finfo(target)
+    return info.min <= values.min() and values.max() <= info.max
+
+
+def _readonly(values: np.ndarray, dtype: str) -> np.ndarray:
+    # Columns already read-only in the canonical dtype (decoded blobs) are used as-is;
+    # a writeable array shared with the caller is copied so the clean frame stays immutable.
+    # Values outside the compact dtype's range (e.g. Year 40000 in int16) keep their own
+    # dtype rather than silently wrapping.
+    if not _fits(values, dtype):
+        dtype = values.dtype
+    converted = values.astype(dtype, copy=False)
+    if converted is values and values.flags.writeable:
+        converted = values.copy()
+    converted.flags.writeable = False
+    return converted
+
+
+def _numeric_values(column: pd.Series) -> np.ndarray:
+    if column.dtype.kind in "biuf":
+        return column.to_numpy()
+    return pd.to_numeric(column, errors="coerce").to_numpy(dtype="float64")
+
+
+def build_clean_frame(df: pd.DataFrame) -> CleanFrame:
+    if df is None or any(col not in df.columns for col in REQUIRED_COLUMNS):
+        empty = pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in CLEAN_DTYPES.items()})
+        return CleanFrame(
+            df=empty,
+            valid=False,
+            cube=aggregates.build_cube(empty),
+            fingerprint=frame_fingerprint(empty),
+        )
+
+    # clean_and_validate_dataset already guarantees this for new data; the check keeps
+    # older saved datasets and ad-hoc callers from leaking NaNs or bad months into pages.
+    numeric = {col: _numeric_values(df[col]) for col in REQUIRED_COLUMNS}
+    keep = np.ones(len(df), dtype=bool)
+    for values in numeric.values():
+        if values.dtype.kind == "f":
+            keep &= ~np.isnan(values)
+    keep &= (numeric["Month"] >= 1) & (numeric["Month"] <= 12)
+    if not keep.all():
+        numeric = {col: values[keep] for col, values in numeric.items()}
+
+    # Fingerprint and cube come from the full-precision columns: the fingerprint then matches
+    # the content hash of the saved blob, and means/peaks carry no float32 rounding noise.
+    source = pd.DataFrame(numeric, copy=False)
+    typed = pd.DataFrame(
+        {col: _readonly(numeric[col], dtype) for col, dtype in CLEAN_DTYPES.items()},
+        copy=False,
+    )
+    return CleanFrame(
+        df=typed,
+        valid=not typed.empty,
+        cube=aggregates.build_cube(source),
+        fingerprint=frame_fingerprint(source),
+    )
@@ -0,0 +1,42 @@
+import hashlib
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+
+def encode_frame(df: pd.DataFrame) -> list[tuple[int, str, str, bytes]]:
+    columns = []
+    for position, name in enumerate(df.columns):
+        values = np.ascontiguousarray(df[name].to_numpy())
+        if values.dtype.kind not in "biuf":
+            raise ValueError(f"Column '{name}' is not numeric and cannot be stored as a column blob.")
+        columns.append((position, str(name), values.dtype.str, values.tobytes()))
+    return columns
+
+
+def decode_frame(rows: list) -> pd.DataFrame:
+    data = {
+        row["column_name"]: np.frombuffer(row["data"], dtype=np.dtype(row["dtype"]))
+        for row in sorted(rows, key=lambda r: r["position"])
+    }
+    return pd.DataFrame(data, copy=False)
+
+
+def content_hash(columns: Iterable[tuple[int, str, str, bytes]]) -> str:
+    digest = hashlib.sha256()
+    for position, name, dtype, data in sorted(columns, key=lambda c: c[0]):
+        digest.update(f"{position}:{name}:{dtype}:{len(data)};".encode("utf-8"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    # Same digest as content_hash(encode_frame(df)), hashed straight from the column
+    # buffers without copying them to bytes first.
+    digest = hashlib.sha256()
+    for position, name in enumerate(df.columns):
+        values = np.ascontiguousarray(df[name].to_numpy())
+        digest.update(f"{position}:{name}:{values.dtype.str}:{values.nbytes};".encode("utf-8"))
+        digest.update(values)
+    return digest.hexdigest()
@@ -1,30 +1,36 @@
 from time import perf_counter
 
-import matplotlib.pyplot as plt
 import pandas as pd
-import seaborn as sns
 import streamlit as st
 
+from . import aggregates
+from . import charts
 from . import database
+from . import risk
+from .anomalies import (
+    DEFAULT_DETECTOR,
+    DETECTORS,
+    AnomalyScores,
+    ZScoreIndex,
+    run_detector,
+    zscore_thresholds,
+)
+from .clean_frame import CleanFrame
+from .preview import render_frame_preview
 
 
-def _build_working_frame(df: pd.DataFrame) -> pd.DataFrame:
-    work = df.copy()
-    work["Year"] = pd.to_numeric(work["Year"], errors="coerce")
-    work["Month"] = pd.to_numeric(work["Month"], errors="coerce")
-    work["Temperature"] = pd.to_numeric(work["Temperature"], errors="coerce")
-    work["Rainfall"] = pd.to_numeric(work["Rainfall"], errors="coerce")
-    work["CO2"] = pd.to_numeric(work["CO2"], errors="coerce")
-    work["Humidity"] = pd.to_numeric(work["Humidity"], errors="coerce")
-    work["WindSpeed"] = pd.to_numeric(work["WindSpeed"], errors="coerce")
-    work = work.dropna(
-        subset=["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
+def anomaly_scores(
+    frame: CleanFrame,
+    year_from: int,
+    year_to: int,
+    detector: str = DEFAULT_DETECTOR,
+    param: int | None = None,
+) -> AnomalyScores:
+    # Scores depend only on the rows in range and the detector, never on the thresholds.
+    return frame.derived(
+        ("anomaly_scores", detector, param, year_from, year_to),
+        lambda: run_detector(frame.year_slice(year_from, year_to), detector, param),
     )
-    work = work[(work["Month"] >= 1) & (work["Month"] <= 12)]
-    work["Year"] = work["Year"].astype(int)
-    work["Month"] = work["Month"].astype(int)
-    work["date_key"] = work["Year"].astype(str) + "-" + work["Month"].astype(str).str.zfill(2)
-    return work
 
 
 def detect_anomalies(
@@ -33,242 +39,336 @@ def detect_anomalies(
     rain_thresh: float = 2.0,
     co2_thresh: float = 2.0,
 ) -> pd.DataFrame:
-    work = _build_working_frame(df)
-    if work.empty:
-        return work
-
-    for col in ["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]:
-        std = work[col].std(ddof=0)
-        if std == 0:
-            work[f"{col}_z"] = 0.0
-        else:
-            work[f"{col}_z"] = (work[col] - work[col].mean()) / std
+    if df.empty:
+        return df
+    return ZScoreIndex.from_frame(df).flagged(
+        df, zscore_thresholds(temp_thresh, rain_thresh, co2_thresh)
+    )
 
-    mask = (
-        work["Temperature_z"].abs() > temp_thresh
-    ) | (work["Rainfall_z"].abs() > rain_thresh) | (work["CO2_z"].abs() > co2_thresh)
-    mask = mask | (work["Humidity_z"].abs() > 2.0) | (work["WindSpeed_z"].abs() > 2.0)
-    return work[mask].copy()
 
+DASHBOARD_PANELS = ["Preview", "KPIs", "Year-Month Aggregation", "Graphs", "Anomalies & Alerts"]
 
-def render_dashboard(df: pd.DataFrame, dataset_name: str, user_id: int) -> None:
-    start = perf_counter()
-    st.subheader("Climate Dashboard")
-    st.caption(f"Active dataset: {dataset_name}")
 
-    work = _build_working_frame(df)
-    if work.empty:
-        st.warning("No valid rows available for dashboard metrics.")
-        return
+def _monthly_means(frame: CleanFrame, year_range: tuple[int, int]) -> pd.DataFrame:
+    return frame.derived(
+        ("monthly_means", *year_range),
+        lambda: aggregates.monthly_means(frame.cube_slice(*year_range)),
+    )
 
-    year_min = int(work["Year"].min())
-    year_max = int(work["Year"].max())
-    year_range = st.slider(
-        "Year range",
-        min_value=year_min,
-        max_value=year_max,
-        value=(year_min, year_max),
+
+def _render_preview_panel(
+    frame: CleanFrame, filtered: pd.DataFrame, year_range: tuple[int, int]
+) -> None:
+    render_frame_preview(
+        filtered, key="dashboard_preview", memo=frame.derived, memo_key=year_range, height=420
     )
 
-    filtered = work[(work["Year"] >= year_range[0]) & (work["Year"] <= year_range[1])].copy()
-    if filtered.empty:
-        st.warning("No data available in selected year range.")
-        return
 
-    tab_preview, tab_kpi, tab_aggregate, tab_graphs, tab_anomaly = st.tabs(
-        ["Preview", "KPIs", "Year-Month Aggregation", "Graphs", "Anomalies & Alerts"]
+def _render_kpi_panel(frame: CleanFrame, year_range: tuple[int, int]) -> None:
+    stats = frame.derived(
+        ("summary_stats", *year_range),
+        lambda: aggregates.summary_stats(frame.cube_slice(*year_range)),
     )
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Avg Temperature", f"{stats.at['Temperature', 'mean']:.2f}")
+    c2.metric("Max Temperature", f"{stats.at['Temperature', 'max']:.2f}")
+    c3.metric("Avg Rainfall", f"{stats.at['Rainfall', 'mean']:.2f}")
+    c4, c5, c6 = st.columns(3)
+    c4.metric("Avg CO2", f"{stats.at['CO2', 'mean']:.2f}")
+    c5.metric("Avg Humidity", f"{stats.at['Humidity', 'mean']:.2f}")
+    c6.metric("Avg WindSpeed", f"{stats.at['WindSpeed', 'mean']:.2f}")
+
+
+def _render_aggregate_panel(frame: CleanFrame, year_range: tuple[int, int]) -> None:
+    st.dataframe(_monthly_means(frame, year_range), width="stretch")
 
-    with tab_preview:
-        st.dataframe(filtered, width="stretch", height=420)
-        st.caption(f"Rows: {len(filtered)}")
-
-    with tab_kpi:
-        c1, c2, c3 = st.columns(3)
-        c1.metric("Avg Temperature", f"{filtered['Temperature'].mean():.2f}")
-        c2.metric("Max Temperature", f"{filtered['Temperature'].max():.2f}")
-        c3.metric("Avg Rainfall", f"{filtered['Rainfall'].mean():.2f}")
-        c4, c5, c6 = st.columns(3)
-        c4.metric("Avg CO2", f"{filtered['CO2'].mean():.2f}")
-        c5.metric("Avg Humidity", f"{filtered['Humidity'].mean():.2f}")
-        c6.metric("Avg WindSpeed", f"{filtered['WindSpeed'].mean():.2f}")
-
-    with tab_aggregate:
-        monthly = (
-            filtered.groupby(["Year", "Month"], as_index=False)[
-                ["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
-            ]
-            .mean()
-            .sort_values(["Year", "Month"])
+
+def _render_graphs_panel(frame: CleanFrame, year_range: tuple[int, int]) -> None:
+    chart_mode = st.radio(
+        "Chart mode",
+        ["Static image", "Interactive (native)"],
+        horizontal=True,
+        key="dashboard_chart_mode",
+        persist_state="page",
+    )
+    series = frame.derived(
+        ("trend_series", *year_range),
+        lambda: charts.downsample_series(_monthly_means(frame, year_range)),
+    )
+    if chart_mode == "Interactive (native)":
+        for measure, trend in series.items():
+            st.caption(f"{measure} Trend")
+            st.line_chart(trend, height=180, color=charts.CHART_COLORS[measure])
+    else:
+        png = frame.derived(("trend_png", *year_range), lambda: charts.render_trend_png(series))
+        st.image(png, width="stretch")
+
+
+def _render_anomaly_panel(
+    frame: CleanFrame,
+    filtered: pd.DataFrame,
+    year_range: tuple[int, int],
+    dataset_name: str,
+    user_id: int,
+) -> None:
+    d1, d2 = st.columns(2)
+    with d1:
+        detector_name = st.selectbox(
+            "Detector",
+            options=list(DETECTORS),
+            format_func=lambda key: DETECTORS[key].label,
+            key="dashboard_detector",
+            persist_state="page",
+        )
+    detector = DETECTORS[detector_name]
+    detector_param = None
+    with d2:
+        if detector.param:
+            detector_param = st.slider(
+                detector.param_label,
+                detector.param_range[0],
+                detector.param_range[1],
+                detector.param_default,
+                key=f"dashboard_detector_{detector_name}_{detector.param}",
+                persist_state="page",
+            )
+
+    c1, c2 = st.columns(2)
+    with c1:
+        temp_thresh = st.slider(
+            "Temperature anomaly threshold (z-score)",
+            1.0,
+            4.0,
+            2.0,
+            0.1,
+            key="dashboard_temp_thresh",
+            persist_state="page",
+        )
+    with c2:
+        rain_thresh = st.slider(
+            "Rainfall anomaly threshold (z-score)",
+            1.0,
+            4.0,
+            2.0,
+            0.1,
+            key="dashboard_rain_thresh",
+            persist_state="page",
         )
-        st.dataframe(monthly, width="stretch")
-
-    with tab_graphs:
-        trend = (
-            filtered.groupby(["Year", "Month"], as_index=False)
-            [["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]]
-            .mean()
-            .sort_values(["Year", "Month"])
+
+    # Keep CO2 threshold fixed unless explicitly required separately.
+    co2_thresh = 2.0
+    scores = anomaly_scores(
+        frame, year_range[0], year_range[1], detector_name, detector_param
+    )
+    anomalies = scores.flagged(
+        filtered, zscore_thresholds(temp_thresh, rain_thresh, co2_thresh)
+    )
+    if anomalies.empty:
+        st.success("No anomalies detected at current threshold.")
+    else:
+        st.warning(f"Detected {len(anomalies)} anomaly rows.")
+        render_frame_preview(
+            anomalies[
+                [
+                    "Year",
+                    "Month",
+                    "Temperature",
+                    "Rainfall",
+                    "CO2",
+                    "Humidity",
+                    "WindSpeed",
+                    "Temperature_z",
+                    "Rainfall_z",
+                    "CO2_z",
+                    "Humidity_z",
+                    "WindSpeed_z",
+                ]
+            ],
+            key="dashboard_anomalies",
+        )
+
+        temp_alerts = anomalies[anomalies["Temperature_z"].abs() > temp_thresh]
+        rain_alerts = anomalies[anomalies["Rainfall_z"].abs() > rain_thresh]
+        co2_alerts = anomalies[anomalies["CO2_z"].abs() > co2_thresh]
+        humidity_alerts = anomalies[anomalies["Humidity_z"].abs() > 2.0]
+        wind_alerts = anomalies[anomalies["WindSpeed_z"].abs() > 2.0]
+        st.info(
+            f"Alerts: Temperature={len(temp_alerts)}, Rainfall={len(rain_alerts)}, CO2={len(co2_alerts)}, Humidity={len(humidity_alerts)}, WindSpeed={len(wind_alerts)}"
         )
-        trend["date_key"] = trend["Year"].astype(str) + "-" + trend["Month"].astype(str).str.zfill(2)
-
-        fig, axes = plt.subplots(5, 1, figsize=(10, 14), sharex=True)
-        sns.lineplot(data=trend, x="date_key", y="Temperature", ax=axes[0], color="#e76f51")
-        axes[0].set_title("Temperature Trend")
-        sns.lineplot(data=trend, x="date_key", y="Rainfall", ax=axes[1], color="#2a9d8f")
-        axes[1].set_title("Rainfall Trend")
-        sns.lineplot(data=trend, x="date_key", y="CO2", ax=axes[2], color="#264653")
-        axes[2].set_title("CO2 Trend")
-        sns.lineplot(data=trend, x="date_key", y="Humidity", ax=axes[3], color="#3f72af")
-        axes[3].set_title("Humidity Trend")
-        sns.lineplot(data=trend, x="date_key", y="WindSpeed", ax=axes[4], color="#f4a261")
-        axes[4].set_title("WindSpeed Trend")
-
-        for ax in axes:
-            ax.tick_params(axis="x", rotation=45)
-            ax.grid(alpha=0.2)
-
-        plt.tight_layout()
-        st.pyplot(fig)
-
-    with tab_anomaly:
-        c1, c2 = st.columns(2)
-        with c1:
-            temp_thresh = st.slider(
-                "Temperature anomaly threshold (z-score)", 1.0, 4.0, 2.0, 0.1
+
+    st.divider()
+    st.markdown("### Disaster Risk Alerts")
+    r1, r2 = st.columns(2)
+    with r1:
+        heatwave_temp_threshold = st.number_input(
+            "Heatwave temperature threshold",
+            min_value=-50.0,
+            max_value=100.0,
+            value=36.0,
+            step=0.5,
+            key="dashboard_heatwave_threshold",
+            persist_state="page",
+        )
+    with r2:
+        flood_rain_threshold = st.number_input(
+            "Flood rainfall threshold",
+            min_value=0.0,
+            max_value=1000.0,
+            value=30.0,
+            step=0.5,
+            key="dashboard_flood_threshold",
+            persist_state="page",
+        )
+
+    heatwave_records = filtered[filtered["Temperature"] > heatwave_temp_threshold]
+    flood_records = filtered[filtered["Rainfall"] > flood_rain_threshold]
+
+    if heatwave_records.empty and flood_records.empty:
+        st.success("No disaster risk alerts at the current thresholds.")
+    else:
+        if not heatwave_records.empty:
+            st.warning(
+                f"Heatwave risk detected: {len(heatwave_records)} record(s) with Temperature > {heatwave_temp_threshold:.1f}"
             )
-        with c2:
-            rain_thresh = st.slider(
-                "Rainfall anomaly threshold (z-score)", 1.0, 4.0, 2.0, 0.1
+        if not flood_records.empty:
+            st.warning(
+                f"Flood risk detected: {len(flood_records)} record(s) with Rainfall > {flood_rain_threshold:.1f}"
             )
 
-        # Keep CO2 threshold fixed unless explicitly required separately.
-        co2_thresh = 2.0
-        anomalies = detect_anomalies(
-            filtered,
-            temp_thresh=temp_thresh,
-            rain_thresh=rain_thresh,
-            co2_thresh=co2_thresh,
-        )
-        if anomalies.empty:
-            st.success("No anomalies detected at current threshold.")
+    c3, c4 = st.columns(2)
+    with c3:
+        st.markdown("#### Heatwave Affected Records")
+        if heatwave_records.empty:
+            st.info("No heatwave-affected records.")
         else:
-            st.warning(f"Detected {len(anomalies)} anomaly rows.")
-            st.dataframe(
-                anomalies[
-                    [
-                        "Year",
-                        "Month",
-                        "Temperature",
-                        "Rainfall",
-                        "CO2",
-                        "Humidity",
-                        "WindSpeed",
-                        "Temperature_z",
-                        "Rainfall_z",
-                        "CO2_z",
-                        "Humidity_z",
-                        "WindSpeed_z",
-                    ]
+            render_frame_preview(
+                heatwave_records[
+                    ["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
                 ],
-                width="stretch",
+                key="dashboard_heatwave_records",
+                default_page_size=25,
             )
-
-            temp_alerts = anomalies[anomalies["Temperature_z"].abs() > temp_thresh]
-            rain_alerts = anomalies[anomalies["Rainfall_z"].abs() > rain_thresh]
-            co2_alerts = anomalies[anomalies["CO2_z"].abs() > co2_thresh]
-            humidity_alerts = anomalies[anomalies["Humidity_z"].abs() > 2.0]
-            wind_alerts = anomalies[anomalies["WindSpeed_z"].abs() > 2.0]
-            st.info(
-                f"Alerts: Temperature={len(temp_alerts)}, Rainfall={len(rain_alerts)}, CO2={len(co2_alerts)}, Humidity={len(humidity_alerts)}, WindSpeed={len(wind_alerts)}"
+    with c4:
+        st.markdown("#### Flood Affected Records")
+        if flood_records.empty:
+            st.info("No flood-affected records.")
+        else:
+            render_frame_preview(
+                flood_records[
+                    ["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
+                ],
+                key="dashboard_flood_records",
+                default_page_size=25,
             )
 
-        st.divider()
-        st.markdown("### Disaster Risk Alerts")
-        r1, r2 = st.columns(2)
-        with r1:
-            heatwave_temp_threshold = st.number_input(
-                "Heatwave temperature threshold",
-                min_value=-50.0,
-                max_value=100.0,
-                value=36.0,
-                step=0.5,
-            )
-        with r2:
-            flood_rain_threshold = st.number_input(
-                "Flood rainfall threshold",
-                min_value=0.0,
-                max_value=1000.0,
-                value=30.0,
-                step=0.5,
-            )
+    st.markdown("#### Consecutive-Month Events")
+    min_months = st.number_input(
+        "Minimum run length (months)",
+        min_value=1,
+        max_value=24,
+        value=risk.EVENT_MIN_MONTHS,
+        step=1,
+        key="dashboard_event_min_months",
+        persist_state="page",
+    )
+    cube_slice = frame.cube_slice(*year_range)
+    heatwave_events = risk.detect_events(
+        cube_slice, risk.RISK_TYPES["heatwave"], heatwave_temp_threshold, int(min_months)
+    )
+    flood_events = risk.detect_events(
+        cube_slice, risk.RISK_TYPES["flood"], flood_rain_threshold, int(min_months)
+    )
+    e1, e2 = st.columns(2)
+    with e1:
+        st.caption(f"Heatwave runs: {len(heatwave_events)}")
+        st.dataframe(heatwave_events, width="stretch", hide_index=True)
+    with e2:
+        st.caption(f"Flood runs: {len(flood_events)}")
+        st.dataframe(flood_events, width="stretch", hide_index=True)
 
-        heatwave_records = filtered[filtered["Temperature"] > heatwave_temp_threshold].copy()
-        flood_records = filtered[filtered["Rainfall"] > flood_rain_threshold].copy()
+    st.markdown("#### Exceedance Curves")
+    st.caption("Records beyond every threshold at once, per risk type.")
+    curves = frame.derived(("risk_curves", *year_range), lambda: risk.scan_risks(filtered))
+    curve_cols = st.columns(2)
+    for position, (name, curve) in enumerate(curves.items()):
+        risk_type = risk.RISK_TYPES[name]
+        sign = ">" if risk_type.direction == "above" else "<"
+        with curve_cols[position % 2]:
+            st.caption(f"{risk_type.label}: records with {risk_type.column} {sign} threshold")
+            st.line_chart(curve, x="threshold", y="records", height=200)
 
-        if heatwave_records.empty and flood_records.empty:
-            st.success("No disaster risk alerts at the current thresholds.")
-        else:
-            if not heatwave_records.empty:
-                st.warning(
-                    f"Heatwave risk detected: {len(heatwave_records)} record(s) with Temperature > {heatwave_temp_threshold:.1f}"
-                )
-            if not flood_records.empty:
-                st.warning(
-                    f"Flood risk detected: {len(flood_records)} record(s) with Rainfall > {flood_rain_threshold:.1f}"
-                )
-
-        c3, c4 = st.columns(2)
-        with c3:
-            st.markdown("#### Heatwave Affected Records")
-            if heatwave_records.empty:
-                st.info("No heatwave-affected records.")
-            else:
-                st.dataframe(
-                    heatwave_records[
-                        ["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
-                    ],
-                    width="stretch",
-                )
-        with c4:
-            st.markdown("#### Flood Affected Records")
-            if flood_records.empty:
-                st.info("No flood-affected records.")
-            else:
-                st.dataframe(
-                    flood_records[
-                        ["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
-                    ],
-                    width="stretch",
-                )
-
-        st.divider()
-        st.markdown("### Save Alerts Snapshot")
-        st.caption(
-            "Store the current anomaly + disaster-risk results as a snapshot for reporting and review."
-        )
-        snapshot_summary = (
-            f"Anomalies={len(anomalies)} | Heatwave={len(heatwave_records)} | Flood={len(flood_records)}"
+    st.divider()
+    st.markdown("### Save Alerts Snapshot")
+    st.caption(
+        "Store the current anomaly + disaster-risk results as a snapshot for reporting and review."
+    )
+    snapshot_summary = (
+        f"Detector={detector.label} | Anomalies={len(anomalies)} | Heatwave={len(heatwave_records)} | Flood={len(flood_records)}"
+        f" | HeatwaveRuns={len(heatwave_events)} | FloodRuns={len(flood_events)}"
+    )
+    if st.button("Save Alerts Snapshot", width="stretch"):
+        dataset_id = st.session_state.get("active_dataset_id")
+        database.insert_alert_snapshot(
+            dataset_id=dataset_id,
+            dataset_name=dataset_name,
+            user_id=user_id,
+            summary_text=snapshot_summary,
+            temp_thresh=float(temp_thresh),
+            rain_thresh=float(rain_thresh),
+            co2_thresh=float(co2_thresh),
+            humidity_thresh=2.0,
+            wind_thresh=2.0,
+            heatwave_threshold=float(heatwave_temp_threshold),
+            flood_threshold=float(flood_rain_threshold),
+            anomaly_count=int(len(anomalies)),
+            heatwave_count=int(len(heatwave_records)),
+            flood_count=int(len(flood_records)),
         )
-        if st.button("Save Alerts Snapshot", width="stretch"):
-            dataset_id = st.session_state.get("active_dataset_id")
-            database.insert_alert_snapshot(
-                dataset_id=dataset_id,
-                dataset_name=dataset_name,
-                user_id=user_id,
-                summary_text=snapshot_summary,
-                temp_thresh=float(temp_thresh),
-                rain_thresh=float(rain_thresh),
-                co2_thresh=float(co2_thresh),
-                humidity_thresh=2.0,
-                wind_thresh=2.0,
-                heatwave_threshold=float(heatwave_temp_threshold),
-                flood_threshold=float(flood_rain_threshold),
-                anomaly_count=int(len(anomalies)),
-                heatwave_count=int(len(heatwave_records)),
-                flood_count=int(len(flood_records)),
-            )
-            st.success("Alerts snapshot saved.")
+        st.success("Alerts snapshot saved.")
+
+
+def render_dashboard(frame: CleanFrame, dataset_name: str, user_id: int) -> None:
+    start = perf_counter()
+    st.subheader("Climate Dashboard")
+    st.caption(f"Active dataset: {dataset_name}")
+
+    if not frame.valid:
+        st.warning("No valid rows available for dashboard metrics.")
+        return
+
+    year_min, year_max = frame.year_bounds()
+    year_range = st.slider(
+        "Year range",
+        min_value=year_min,
+        max_value=year_max,
+        value=(year_min, year_max),
+    )
+
+    filtered = frame.year_slice(year_range[0], year_range[1])
+    if filtered.empty:
+        st.warning("No data available in selected year range.")
+        return
+
+    # Lazy tabs: only the open panel's body runs, and its results are memoized on the
+    # clean frame, so a widget change in one panel does not recompute the others.
+    tabs = st.tabs(DASHBOARD_PANELS, key="dashboard_panel", on_change="rerun")
+    tab_preview, tab_kpi, tab_aggregate, tab_graphs, tab_anomaly = tabs
+
+    if tab_preview.open:
+        with tab_preview:
+            _render_preview_panel(frame, filtered, year_range)
+    if tab_kpi.open:
+        with tab_kpi:
+            _render_kpi_panel(frame, year_range)
+    if tab_aggregate.open:
+        with tab_aggregate:
+            _render_aggregate_panel(frame, year_range)
+    if tab_graphs.open:
+        with tab_graphs:
+            _render_graphs_panel(frame, year_range)
+    if tab_anomaly.open:
+        with tab_anomaly:
+            _render_anomaly_panel(frame, filtered, year_range, dataset_name, user_id)
 
     elapsed_ms = (perf_counter() - start) * 1000
     database.log_performance(user_id, "generate_dashboard", elapsed_ms)
@@ -1,114 +1,352 @@
-import sqlite3
+import atexit
+import os
+import queue
+import threading
+import time
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Iterable, Optional
 
+from . import backends
+from .backends import BackendConnection, Row
+from .columnar import content_hash
+
 DB_NAME = "earthscape.db"
 
+PERF_LOG_SETTINGS = {
+    "queue_size": int(os.environ.get("EARTHSCAPE_PERF_LOG_QUEUE_SIZE", "10000")),
+    "batch_size": int(os.environ.get("EARTHSCAPE_PERF_LOG_BATCH_SIZE", "200")),
+    "flush_interval_s": float(os.environ.get("EARTHSCAPE_PERF_LOG_FLUSH_INTERVAL_S", "1.0")),
+}
+# Models fitted on uploads that were never saved are kept this long, then pruned.
+MODEL_ORPHAN_TTL_HOURS = float(os.environ.get("EARTHSCAPE_MODEL_ORPHAN_TTL_HOURS", "24"))
+
+
+def get_backend(db_path: Optional[str] = None) -> backends.StorageBackend:
+    return backends.resolve_backend(db_path, DB_NAME)
+
+
+def close_connections() -> None:
+    backends.close_connections()
+
 
 @contextmanager
-def get_connection(db_path: str = DB_NAME):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
+def get_connection(db_path: Optional[str] = None):
+    # A pooled connection is checked out for the block, which commits or rolls back on exit.
+    backend = get_backend(db_path)
+    conn = backend.acquire()
     try:
         yield conn
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     finally:
-        conn.close()
+        backend.release(conn)
 
 
 def now_utc() -> str:
     return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
 
-def init_db(db_path: str = DB_NAME) -> None:
-    with get_connection(db_path) as conn:
-        conn.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                role TEXT NOT NULL CHECK(role IN ('admin', 'analyst')),
-                fullname TEXT NOT NULL DEFAULT '',
-                is_active INTEGER NOT NULL DEFAULT 1,
-                created_at TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS datasets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                dataset_name TEXT NOT NULL,
-                uploaded_by INTEGER NOT NULL,
-                upload_time TEXT NOT NULL,
-                raw_csv_text TEXT NOT NULL,
-                FOREIGN KEY (uploaded_by) REFERENCES users(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS dataset_access (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                dataset_id INTEGER NOT NULL,
-                user_id INTEGER NOT NULL,
-                granted_by INTEGER NOT NULL,
-                granted_at TEXT NOT NULL,
-                UNIQUE(dataset_id, user_id),
-                FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE CASCADE,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                FOREIGN KEY (granted_by) REFERENCES users(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS feedback (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                subject TEXT NOT NULL,
-                message TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                status TEXT NOT NULL CHECK(status IN ('open', 'closed')) DEFAULT 'open',
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS performance_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                action_name TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                execution_time_ms REAL NOT NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            );
-
-            CREATE TABLE IF NOT EXISTS alerts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                dataset_id INTEGER,
-                dataset_name TEXT NOT NULL,
-                user_id INTEGER,
-                created_at TEXT NOT NULL,
-                summary_text TEXT NOT NULL,
-                temp_thresh REAL,
-                rain_thresh REAL,
-                co2_thresh REAL,
-                humidity_thresh REAL,
-                wind_thresh REAL,
-                heatwave_threshold REAL,
-                flood_threshold REAL,
-                anomaly_count INTEGER NOT NULL,
-                heatwave_count INTEGER NOT NULL,
-                flood_count INTEGER NOT NULL,
-                FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE SET NULL,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
-            );
-            """
-        )
-        _migrate_users_table(conn)
-
-
-def _migrate_users_table(conn: sqlite3.Connection) -> None:
-    cols = {row["name"] for row in conn.execute("PRAGMA table_info(users)").fetchall()}
+_BASE_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL CHECK(role IN ('admin', 'analyst')),
+        fullname TEXT NOT NULL DEFAULT '',
+        is_active INTEGER NOT NULL DEFAULT 1,
+        created_at TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS datasets (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_name TEXT NOT NULL,
+        uploaded_by INTEGER NOT NULL,
+        upload_time TEXT NOT NULL,
+        raw_csv_text TEXT NOT NULL,
+        FOREIGN KEY (uploaded_by) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dataset_columns (
+        dataset_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        column_name TEXT NOT NULL,
+        dtype TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (dataset_id, position),
+        FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE CASCADE
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dataset_access (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        granted_by INTEGER NOT NULL,
+        granted_at TEXT NOT NULL,
+        UNIQUE(dataset_id, user_id),
+        FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE CASCADE,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+        FOREIGN KEY (granted_by) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS feedback (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        subject TEXT NOT NULL,
+        message TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        status TEXT NOT NULL CHECK(status IN ('open', 'closed')) DEFAULT 'open',
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS performance_logs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        action_name TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        execution_time_ms REAL NOT NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS alerts (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        dataset_id INTEGER,
+        dataset_name TEXT NOT NULL,
+        user_id INTEGER,
+        created_at TEXT NOT NULL,
+        summary_text TEXT NOT NULL,
+        temp_thresh REAL,
+        rain_thresh REAL,
+        co2_thresh REAL,
+        humidity_thresh REAL,
+        wind_thresh REAL,
+        heatwave_threshold REAL,
+        flood_threshold REAL,
+        anomaly_count INTEGER NOT NULL,
+        heatwave_count INTEGER NOT NULL,
+        flood_count INTEGER NOT NULL,
+        FOREIGN KEY (dataset_id) REFERENCES datasets(id) ON DELETE SET NULL,
+        FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE SET NULL
+    )
+    """,
+]
+
+
+def _create_base_schema(conn: BackendConnection) -> None:
+    for statement in _BASE_SCHEMA:
+        conn.execute(statement)
+
+
+def _migrate_users_table(conn: BackendConnection) -> None:
+    cols = conn.table_columns("users")
     if "fullname" not in cols:
         conn.execute("ALTER TABLE users ADD COLUMN fullname TEXT NOT NULL DEFAULT ''")
     if "is_active" not in cols:
         conn.execute("ALTER TABLE users ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1")
 
 
+def _create_hot_path_indexes(conn: BackendConnection) -> None:
+    for statement in [
+        """
+        CREATE INDEX IF NOT EXISTS idx_performance_logs_timestamp
+            ON performance_logs(timestamp, user_id, action_name, execution_time_ms)
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_alerts_dataset_id_created ON alerts(dataset_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_alerts_dataset_name_created ON alerts(dataset_name, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_alerts_created ON alerts(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_user_created ON feedback(user_id, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_feedback_created ON feedback(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_dataset_access_user ON dataset_access(user_id, dataset_id)",
+        "CREATE INDEX IF NOT EXISTS idx_datasets_upload_time ON datasets(upload_time)",
+    ]:
+        conn.execute(statement)
+
+
+def _store_blob(conn: BackendConnection, columns: list[tuple[int, str, str, bytes]]) -> str:
+    blob_hash = content_hash(columns)
+    cur = conn.execute(
+        """
+        INSERT OR IGNORE INTO dataset_blobs (content_hash, ref_count, byte_size, created_at)
+        VALUES (?, 0, ?, ?)
+        """,
+        (blob_hash, sum(len(data) for _, _, _, data in columns), now_utc()),
+    )
+    if cur.rowcount == 1:
+        conn.executemany(
+            """
+            INSERT INTO dataset_blob_columns (content_hash, position, column_name, dtype, data)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                (blob_hash, position, column_name, dtype, bytes(data))
+                for position, column_name, dtype, data in columns
+            ],
+        )
+    conn.execute(
+        "UPDATE dataset_blobs SET ref_count = ref_count + 1 WHERE content_hash = ?",
+        (blob_hash,),
+    )
+    return blob_hash
+
+
+def _release_blob(conn: BackendConnection, blob_hash: Optional[str]) -> None:
+    if not blob_hash:
+        return
+    conn.execute(
+        "UPDATE dataset_blobs SET ref_count = ref_count - 1 WHERE content_hash = ?",
+        (blob_hash,),
+    )
+    conn.execute(
+        "DELETE FROM dataset_blobs WHERE content_hash = ? AND ref_count <= 0",
+        (blob_hash,),
+    )
+    # Registered models outlive a dataset row only while some dataset still holds the content.
+    conn.execute(
+        """
+        DELETE FROM model_registry
+        WHERE content_hash = ?
+          AND NOT EXISTS (SELECT 1 FROM dataset_blobs WHERE content_hash = ?)
+        """,
+        (blob_hash, blob_hash),
+    )
+
+
+def _migrate_content_addressed_blobs(conn: BackendConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dataset_blobs (
+            content_hash TEXT PRIMARY KEY,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            byte_size INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dataset_blob_columns (
+            content_hash TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            dtype TEXT NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (content_hash, position),
+            FOREIGN KEY (content_hash) REFERENCES dataset_blobs(content_hash) ON DELETE CASCADE
+        )
+        """
+    )
+    cols = conn.table_columns("datasets")
+    if "content_hash" not in cols:
+        conn.execute(
+            "ALTER TABLE datasets ADD COLUMN content_hash TEXT REFERENCES dataset_blobs(content_hash)"
+        )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_datasets_content_hash ON datasets(content_hash)")
+
+    # Move per-dataset column copies into shared blobs, then drop the old table.
+    dataset_ids = [
+        row["dataset_id"]
+        for row in conn.execute("SELECT DISTINCT dataset_id FROM dataset_columns").fetchall()
+    ]
+    for dataset_id in dataset_ids:
+        columns = [
+            (row["position"], row["column_name"], row["dtype"], bytes(row["data"]))
+            for row in conn.execute(
+                """
+                SELECT position, column_name, dtype, data
+                FROM dataset_columns
+                WHERE dataset_id = ?
+                ORDER BY position
+                """,
+                (dataset_id,),
+            ).fetchall()
+        ]
+        blob_hash = _store_blob(conn, columns)
+        conn.execute("UPDATE datasets SET content_hash = ? WHERE id = ?", (blob_hash, dataset_id))
+    conn.execute("DROP TABLE IF EXISTS dataset_columns")
+
+
+def _create_model_registry(conn: BackendConnection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS model_registry (
+            content_hash TEXT NOT NULL,
+            feature_set TEXT NOT NULL,
+            model_type TEXT NOT NULL,
+            model_blob BLOB NOT NULL,
+            metrics_json TEXT NOT NULL,
+            feature_defaults_json TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (content_hash, feature_set, model_type)
+        )
+        """
+    )
+
+
+# Ordered, append-only list of (version, name, apply). Never renumber or edit an
+# applied migration; add a new one instead. Each step must be safe to run on
+# databases created before schema_version existed.
+MIGRATIONS = [
+    (1, "base_schema", _create_base_schema),
+    (2, "users_fullname_is_active", _migrate_users_table),
+    (3, "hot_path_indexes", _create_hot_path_indexes),
+    (4, "content_addressed_blobs", _migrate_content_addressed_blobs),
+    (5, "model_registry", _create_model_registry),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def _current_schema_version(conn: BackendConnection) -> int:
+    try:
+        row = conn.execute("SELECT MAX(version) AS v FROM schema_version").fetchone()
+    except conn.backend.errors:
+        conn.rollback()
+        return 0
+    return int(row["v"] or 0)
+
+
+def init_db(db_path: Optional[str] = None) -> None:
+    with get_connection(db_path) as conn:
+        if _current_schema_version(conn) >= SCHEMA_VERSION:
+            return
+        _run_migrations(conn)
+
+
+def _run_migrations(conn: BackendConnection) -> None:
+    conn.commit()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    for version, name, apply in MIGRATIONS:
+        # Take the backend's write lock so concurrent app processes apply each step once.
+        conn.begin_exclusive()
+        try:
+            if _current_schema_version(conn) < version:
+                apply(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, now_utc()),
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
 def create_user(
     username: str,
     password_hash: str,
@@ -117,29 +355,28 @@ def create_user(
     is_active: int = 1,
 ) -> int:
     with get_connection() as conn:
-        cur = conn.execute(
+        return conn.insert_returning_id(
             """
             INSERT INTO users (username, password_hash, role, fullname, is_active, created_at)
             VALUES (?, ?, ?, ?, ?, ?)
             """,
             (username, password_hash, role, fullname, is_active, now_utc()),
         )
-        return cur.lastrowid
 
 
-def get_user_by_username(username: str) -> Optional[sqlite3.Row]:
+def get_user_by_username(username: str) -> Optional[Row]:
     with get_connection() as conn:
         return conn.execute(
             "SELECT * FROM users WHERE username = ?", (username,)
         ).fetchone()
 
 
-def get_user_by_id(user_id: int) -> Optional[sqlite3.Row]:
+def get_user_by_id(user_id: int) -> Optional[Row]:
     with get_connection() as conn:
         return conn.execute("SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
 
 
-def list_users(role: Optional[str] = None) -> list[sqlite3.Row]:
+def list_users(role: Optional[str] = None) -> list[Row]:
     with get_connection() as conn:
         if role:
             return conn.execute(
@@ -148,7 +385,7 @@ def list_users(role: Optional[str] = None) -> list[sqlite3.Row]:
         return conn.execute("SELECT * FROM users ORDER BY role, username").fetchall()
 
 
-def list_analysts() -> list[sqlite3.Row]:
+def list_analysts() -> list[Row]:
     return list_users(role="analyst")
 
 
@@ -168,19 +405,26 @@ def set_user_active(user_id: int, is_active: int) -> None:
         conn.execute("UPDATE users SET is_active = ? WHERE id = ?", (is_active, user_id))
 
 
-def insert_dataset(dataset_name: str, uploaded_by: int, raw_csv_text: str) -> int:
+def insert_dataset(
+    dataset_name: str,
+    uploaded_by: int,
+    columns: Iterable[tuple[int, str, str, bytes]],
+    raw_csv_text: str = "",
+) -> int:
     with get_connection() as conn:
-        cur = conn.execute(
+        # Identical cleaned content is stored once and shared by every dataset row that uploads it.
+        blob_hash = _store_blob(conn, list(columns))
+        dataset_id = conn.insert_returning_id(
             """
-            INSERT INTO datasets (dataset_name, uploaded_by, upload_time, raw_csv_text)
-            VALUES (?, ?, ?, ?)
+            INSERT INTO datasets (dataset_name, uploaded_by, upload_time, raw_csv_text, content_hash)
+            VALUES (?, ?, ?, ?, ?)
             """,
-            (dataset_name, uploaded_by, now_utc(), raw_csv_text),
+            (dataset_name, uploaded_by, now_utc(), raw_csv_text, blob_hash),
         )
-        return cur.lastrowid
+        return dataset_id
 
 
-def list_datasets_for_admin() -> list[sqlite3.Row]:
+def list_datasets_for_admin() -> list[Row]:
     with get_connection() as conn:
         return conn.execute(
             """
@@ -190,13 +434,13 @@ def list_datasets_for_admin() -> list[sqlite3.Row]:
             FROM datasets d
             JOIN users u ON d.uploaded_by = u.id
             LEFT JOIN dataset_access da ON da.dataset_id = d.id
-            GROUP BY d.id
+            GROUP BY d.id, u.username
             ORDER BY d.upload_time DESC
             """
         ).fetchall()
 
 
-def list_datasets_for_user(user_id: int, role: str) -> list[sqlite3.Row]:
+def list_datasets_for_user(user_id: int, role: str) -> list[Row]:
     with get_connection() as conn:
         if role == "admin":
             return conn.execute(
@@ -221,7 +465,7 @@ def list_datasets_for_user(user_id: int, role: str) -> list[sqlite3.Row]:
         ).fetchall()
 
 
-def get_dataset_by_id(dataset_id: int) -> Optional[sqlite3.Row]:
+def get_dataset_by_id(dataset_id: int) -> Optional[Row]:
     with get_connection() as conn:
         return conn.execute(
             """
@@ -234,6 +478,20 @@ def get_dataset_by_id(dataset_id: int) -> Optional[sqlite3.Row]:
         ).fetchone()
 
 
+def list_dataset_columns(dataset_id: int) -> list[Row]:
+    with get_connection() as conn:
+        return conn.execute(
+            """
+            SELECT c.position, c.column_name, c.dtype, c.data
+            FROM datasets d
+            JOIN dataset_blob_columns c ON c.content_hash = d.content_hash
+            WHERE d.id = ?
+            ORDER BY c.position
+            """,
+            (dataset_id,),
+        ).fetchall()
+
+
 def grant_dataset_access(dataset_id: int, user_id: int, granted_by: int) -> None:
     with get_connection() as conn:
         conn.execute(
@@ -259,7 +517,69 @@ def grant_dataset_access_bulk(dataset_id: int, user_ids: Iterable[int], granted_
         )
 
 
-def list_dataset_access(dataset_id: int) -> list[sqlite3.Row]:
+def get_model_artifact(content_hash: str, feature_set: str, model_type: str) -> Optional[Row]:
+    with get_connection() as conn:
+        return conn.execute(
+            """
+            SELECT model_blob, metrics_json, feature_defaults_json, created_at
+            FROM model_registry
+            WHERE content_hash = ? AND feature_set = ? AND model_type = ?
+            """,
+            (content_hash, feature_set, model_type),
+        ).fetchone()
+
+
+def insert_model_artifact(
+    content_hash: str,
+    feature_set: str,
+    model_type: str,
+    model_blob: bytes,
+    metrics_json: str,
+    feature_defaults_json: str,
+) -> bool:
+    # Same content, features and model type give the same fit, so the first writer wins.
+    with get_connection() as conn:
+        cur = conn.execute(
+            """
+            INSERT OR IGNORE INTO model_registry (
+                content_hash, feature_set, model_type, model_blob,
+                metrics_json, feature_defaults_json, created_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                content_hash,
+                feature_set,
+                model_type,
+                model_blob,
+                metrics_json,
+                feature_defaults_json,
+                now_utc(),
+            ),
+        )
+        inserted = cur.rowcount == 1
+        if inserted:
+            _prune_orphan_models(conn)
+        return inserted
+
+
+def _prune_orphan_models(conn: BackendConnection) -> None:
+    # Uploads are fitted before they are saved; _release_blob only covers content that had a
+    # blob, so models of uploads that never got one are dropped here once they are stale.
+    cutoff = datetime.utcnow() - timedelta(hours=MODEL_ORPHAN_TTL_HOURS)
+    conn.execute(
+        """
+        DELETE FROM model_registry
+        WHERE created_at < ?
+          AND NOT EXISTS (
+              SELECT 1 FROM dataset_blobs WHERE dataset_blobs.content_hash = model_registry.content_hash
+          )
+        """,
+        (cutoff.strftime("%Y-%m-%d %H:%M:%S"),),
+    )
+
+
+def list_dataset_access(dataset_id: int) -> list[Row]:
     with get_connection() as conn:
         return conn.execute(
             """
@@ -286,36 +606,40 @@ def revoke_dataset_access(dataset_id: int, user_id: int) -> None:
 
 def delete_dataset(dataset_id: int) -> None:
     with get_connection() as conn:
+        row = conn.execute(
+            "SELECT content_hash FROM datasets WHERE id = ?", (dataset_id,)
+        ).fetchone()
         conn.execute("DELETE FROM datasets WHERE id = ?", (dataset_id,))
+        if row:
+            _release_blob(conn, row["content_hash"])
 
 
 def insert_feedback(user_id: int, subject: str, message: str) -> int:
     with get_connection() as conn:
-        cur = conn.execute(
+        return conn.insert_returning_id(
             """
             INSERT INTO feedback (user_id, subject, message, created_at, status)
             VALUES (?, ?, ?, ?, 'open')
             """,
             (user_id, subject, message, now_utc()),
         )
-        return cur.lastrowid
 
 
-def list_feedback_for_user(user_id: int) -> list[sqlite3.Row]:
+_FEEDBACK_FOR_USER_SQL = """
+    SELECT f.*, u.username
+    FROM feedback f
+    JOIN users u ON f.user_id = u.id
+    WHERE f.user_id = ?
+    ORDER BY f.created_at DESC
+"""
+
+
+def list_feedback_for_user(user_id: int) -> list[Row]:
     with get_connection() as conn:
-        return conn.execute(
-            """
-            SELECT f.*, u.username
-            FROM feedback f
-            JOIN users u ON f.user_id = u.id
-            WHERE f.user_id = ?
-            ORDER BY f.created_at DESC
-            """,
-            (user_id,),
-        ).fetchall()
+        return conn.execute(_FEEDBACK_FOR_USER_SQL, (user_id,)).fetchall()
 
 
-def list_all_feedback() -> list[sqlite3.Row]:
+def list_all_feedback() -> list[Row]:
     with get_connection() as conn:
         return conn.execute(
             """
@@ -339,30 +663,173 @@ def delete_feedback(feedback_id: int) -> None:
         conn.execute("DELETE FROM feedback WHERE id = ?", (feedback_id,))
 
 
-def log_performance(user_id: Optional[int], action_name: str, execution_time_ms: float) -> int:
-    with get_connection() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO performance_logs (user_id, action_name, timestamp, execution_time_ms)
-            VALUES (?, ?, ?, ?)
-            """,
-            (user_id, action_name, now_utc(), execution_time_ms),
-        )
-        return cur.lastrowid
-
-
-def list_performance_logs(limit: int = 1000) -> list[sqlite3.Row]:
+class PerformanceLogSink:
+    """Buffers performance_logs rows in memory and writes them in batches off the request path."""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        queue_size: int = 10000,
+        batch_size: int = 200,
+        flush_interval_s: float = 1.0,
+    ) -> None:
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = flush_interval_s
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop = threading.Event()
+        self._flush_requested = threading.Event()
+        self._write_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._drop_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, user_id: Optional[int], action_name: str, execution_time_ms: float) -> bool:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((user_id, action_name, now_utc(), float(execution_time_ms)))
+            return True
+        except queue.Full:
+            self._count_dropped(1)
+            return False
+
+    def flush(self) -> None:
+        # Write everything queued so far, including a batch the sink thread is still
+        # collecting, before returning; readers call this to see their own rows.
+        self._flush_requested.set()
+        try:
+            batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            self._queue.join()
+        finally:
+            self._flush_requested.clear()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.flush_interval_s * 2))
+        self.flush()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="performance-log-sink", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._write(self._next_batch())
+
+    def _next_batch(self) -> list[tuple]:
+        # Flush when the batch is full or the interval since its first row has elapsed.
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval_s)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval_s
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            if self._flush_requested.is_set():
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                # Short waits so a pending flush() is not held up for the whole interval.
+                batch.append(self._queue.get(timeout=min(remaining, 0.05)))
+            except queue.Empty:
+                if remaining <= 0.05:
+                    break
+        return batch
+
+    def _write(self, batch: list[tuple]) -> None:
+        if not batch:
+            return
+        with self._write_lock:
+            try:
+                with get_connection(self.db_path) as conn:
+                    conn.executemany(
+                        """
+                        INSERT INTO performance_logs (user_id, action_name, timestamp, execution_time_ms)
+                        VALUES (?, ?, ?, ?)
+                        """,
+                        batch,
+                    )
+            except get_backend(self.db_path).errors:
+                self._count_dropped(len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _count_dropped(self, count: int) -> None:
+        with self._drop_lock:
+            self.dropped += count
+
+
+_perf_log_sink = PerformanceLogSink(
+    queue_size=PERF_LOG_SETTINGS["queue_size"],
+    batch_size=PERF_LOG_SETTINGS["batch_size"],
+    flush_interval_s=PERF_LOG_SETTINGS["flush_interval_s"],
+)
+atexit.register(_perf_log_sink.close)
+
+
+def log_performance(user_id: Optional[int], action_name: str, execution_time_ms: float) -> bool:
+    return _perf_log_sink.submit(user_id, action_name, execution_time_ms)
+
+
+def flush_performance_logs() -> None:
+    _perf_log_sink.flush()
+
+
+def performance_log_drop_count() -> int:
+    return _perf_log_sink.dropped
+
+
+_PERFORMANCE_LOGS_SQL = """
+    SELECT p.*, u.username
+    FROM performance_logs p
+    LEFT JOIN users u ON p.user_id = u.id
+    ORDER BY p.timestamp DESC
+    LIMIT ?
+"""
+
+
+def list_performance_logs(limit: int = 1000) -> list[Row]:
+    flush_performance_logs()
     with get_connection() as conn:
-        return conn.execute(
-            """
-            SELECT p.*, u.username
-            FROM performance_logs p
-            LEFT JOIN users u ON p.user_id = u.id
-            ORDER BY p.timestamp DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
+        return conn.execute(_PERFORMANCE_LOGS_SQL, (limit,)).fetchall()
+
+
+ALERT_SNAPSHOT_COLUMNS = [
+    "dataset_id",
+    "dataset_name",
+    "user_id",
+    "summary_text",
+    "temp_thresh",
+    "rain_thresh",
+    "co2_thresh",
+    "humidity_thresh",
+    "wind_thresh",
+    "heatwave_threshold",
+    "flood_threshold",
+    "anomaly_count",
+    "heatwave_count",
+    "flood_count",
+]
+_INSERT_ALERT_SQL = f"""
+    INSERT INTO alerts (created_at, {", ".join(ALERT_SNAPSHOT_COLUMNS)})
+    VALUES (?, {", ".join("?" for _ in ALERT_SNAPSHOT_COLUMNS)})
+"""
 
 
 def insert_alert_snapshot(
@@ -382,20 +849,13 @@ def insert_alert_snapshot(
     flood_count: int,
 ) -> int:
     with get_connection() as conn:
-        cur = conn.execute(
-            """
-            INSERT INTO alerts (
-                dataset_id, dataset_name, user_id, created_at, summary_text,
-                temp_thresh, rain_thresh, co2_thresh, humidity_thresh, wind_thresh,
-                heatwave_threshold, flood_threshold, anomaly_count, heatwave_count, flood_count
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        return conn.insert_returning_id(
+            _INSERT_ALERT_SQL,
             (
+                now_utc(),
                 dataset_id,
                 dataset_name,
                 user_id,
-                now_utc(),
                 summary_text,
                 temp_thresh,
                 rain_thresh,
@@ -409,33 +869,71 @@ def insert_alert_snapshot(
                 flood_count,
             ),
         )
-        return cur.lastrowid
 
 
-def list_alerts_for_dataset(dataset_id: Optional[int], dataset_name: str, limit: int = 200) -> list[sqlite3.Row]:
+def insert_alert_snapshots(snapshots: Iterable[Row]) -> int:
+    # Bulk path for batch jobs: every snapshot is written in one transaction.
+    created_at = now_utc()
+    rows = [
+        (created_at, *(snapshot[col] for col in ALERT_SNAPSHOT_COLUMNS)) for snapshot in snapshots
+    ]
+    if not rows:
+        return 0
+    with get_connection() as conn:
+        conn.executemany(_INSERT_ALERT_SQL, rows)
+    return len(rows)
+
+
+# Each UNION branch is served by its own (column, created_at) index; an OR across
+# the two columns would make SQLite fall back to scanning the whole alerts table.
+_ALERTS_FOR_DATASET_SQL = """
+    SELECT a.*, u.username
+    FROM alerts a
+    LEFT JOIN users u ON a.user_id = u.id
+    WHERE a.id IN (
+        SELECT id FROM alerts WHERE dataset_id = ?
+        UNION
+        SELECT id FROM alerts WHERE dataset_name = ?
+    )
+    ORDER BY a.created_at DESC
+    LIMIT ?
+"""
+
+
+def list_alerts_for_dataset(dataset_id: Optional[int], dataset_name: str, limit: int = 200) -> list[Row]:
     with get_connection() as conn:
         return conn.execute(
-            """
-            SELECT a.*, u.username
-            FROM alerts a
-            LEFT JOIN users u ON a.user_id = u.id
-            WHERE (a.dataset_id = ? OR a.dataset_name = ?)
-            ORDER BY a.created_at DESC
-            LIMIT ?
-            """,
-            (dataset_id, dataset_name, limit),
+            _ALERTS_FOR_DATASET_SQL, (dataset_id, dataset_name, limit)
         ).fetchall()
 
 
-def list_recent_alerts(limit: int = 200) -> list[sqlite3.Row]:
+_RECENT_ALERTS_SQL = """
+    SELECT a.*, u.username
+    FROM alerts a
+    LEFT JOIN users u ON a.user_id = u.id
+    ORDER BY a.created_at DESC
+    LIMIT ?
+"""
+
+
+def list_recent_alerts(limit: int = 200) -> list[Row]:
     with get_connection() as conn:
-        return conn.execute(
-            """
-            SELECT a.*, u.username
-            FROM alerts a
-            LEFT JOIN users u ON a.user_id = u.id
-            ORDER BY a.created_at DESC
-            LIMIT ?
-            """,
-            (limit,),
-        ).fetchall()
+        return conn.execute(_RECENT_ALERTS_SQL, (limit,)).fetchall()
+
+
+HOT_QUERIES = {
+    "list_performance_logs": (_PERFORMANCE_LOGS_SQL, (1000,)),
+    "list_alerts_for_dataset": (_ALERTS_FOR_DATASET_SQL, (1, "dataset.csv", 200)),
+    "list_recent_alerts": (_RECENT_ALERTS_SQL, (200,)),
+    "list_feedback_for_user": (_FEEDBACK_FOR_USER_SQL, (1,)),
+}
+
+
+def find_full_table_scans(db_path: Optional[str] = None) -> dict[str, list[str]]:
+    scans = {}
+    with get_connection(db_path) as conn:
+        for name, (sql, params) in HOT_QUERIES.items():
+            full = conn.full_scans(sql, params)
+            if full:
+                scans[name] = full
+    return scans
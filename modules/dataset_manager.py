@@ -1,36 +1,49 @@
 from io import StringIO
 from time import perf_counter
+from typing import Callable, Optional
 
 import pandas as pd
 import streamlit as st
 
+from . import columnar
 from . import database
+from . import frame_cache
 from . import prediction
+from .clean_frame import CleanFrame, build_clean_frame
+from .preview import render_frame_preview
 from .utils import REQUIRED_COLUMNS, card, show_toast
 
 
 NUMERIC_COLUMNS = ["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
+INGEST_CHUNK_ROWS = 50_000
 
 
-def clean_and_validate_dataset(df: pd.DataFrame) -> tuple[pd.DataFrame | None, list[str]]:
-    errors: list[str] = []
+# Raw text of rows with an unparseable cell, so rows that differ only in junk text are not
+# collapsed once that text is coerced to NaN.
+_RAW_KEY = "__raw__"
 
-    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-    if missing:
-        errors.append(f"Missing required columns: {', '.join(missing)}")
-        return None, errors
 
-    cleaned = df[REQUIRED_COLUMNS].copy()
-    cleaned = cleaned.drop_duplicates()
+def _coerce_rows(raw: pd.DataFrame) -> pd.DataFrame:
+    part = pd.DataFrame(
+        {col: pd.to_numeric(raw[col], errors="coerce") for col in REQUIRED_COLUMNS},
+        dtype="float64",
+    )
+    junk = (part.isna() & raw[REQUIRED_COLUMNS].notna()).any(axis=1).to_numpy()
+    part[_RAW_KEY] = None
+    if junk.any():
+        text = raw.loc[junk, REQUIRED_COLUMNS].astype(str).agg("\x1f".join, axis=1)
+        part.loc[junk, _RAW_KEY] = text.to_numpy()
+    return part[part["Year"].notna() & part["Month"].between(1, 12)]
 
-    cleaned["Year"] = pd.to_numeric(cleaned["Year"], errors="coerce")
-    cleaned["Month"] = pd.to_numeric(cleaned["Month"], errors="coerce")
 
-    for col in NUMERIC_COLUMNS:
-        cleaned[col] = pd.to_numeric(cleaned[col], errors="coerce")
-
-    cleaned = cleaned.dropna(subset=["Year", "Month"])
-    cleaned = cleaned[(cleaned["Month"] >= 1) & (cleaned["Month"] <= 12)]
+def _finish_cleaning(parts: list[pd.DataFrame], errors: list[str]) -> tuple[pd.DataFrame | None, list[str]]:
+    if not parts:
+        errors.append("Dataset is empty after cleaning.")
+        return None, errors
+    # Duplicates are judged on the parsed values plus the raw text of junk cells; dropping
+    # rows with a bad Year/Month first does not change which of the others survive.
+    cleaned = pd.concat(parts, ignore_index=True).drop_duplicates(ignore_index=True)
+    cleaned = cleaned.drop(columns=_RAW_KEY)
 
     for col in NUMERIC_COLUMNS:
         if cleaned[col].isna().all():
@@ -47,6 +60,63 @@ def clean_and_validate_dataset(df: pd.DataFrame) -> tuple[pd.DataFrame | None, l
     return cleaned, errors
 
 
+def _missing_columns(df: pd.DataFrame) -> list[str]:
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    return [f"Missing required columns: {', '.join(missing)}"] if missing else []
+
+
+def clean_and_validate_dataset(df: pd.DataFrame) -> tuple[pd.DataFrame | None, list[str]]:
+    errors = _missing_columns(df)
+    if errors:
+        return None, errors
+    return _finish_cleaning([_coerce_rows(df)], errors)
+
+
+def ingest_csv_stream(
+    source,
+    total_bytes: Optional[int] = None,
+    chunk_rows: int = INGEST_CHUNK_ROWS,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> tuple[pd.DataFrame | None, list[str]]:
+    # clean_and_validate_dataset applied chunk by chunk, so only one raw chunk is held at a
+    # time; surviving rows are kept as compact float64 columns.
+    parts = []
+    for chunk in pd.read_csv(
+        source, chunksize=chunk_rows, encoding="utf-8", encoding_errors="replace"
+    ):
+        errors = _missing_columns(chunk)
+        if errors:
+            return None, errors
+        parts.append(_coerce_rows(chunk))
+
+        if on_progress and total_bytes:
+            on_progress(min(source.tell() / total_bytes, 1.0))
+
+    return _finish_cleaning(parts, [])
+
+
+def load_saved_dataset(dataset_row) -> tuple[CleanFrame | None, list[str]]:
+    # Frames are shared read-only across sessions; the version changes whenever content does.
+    version = dataset_row["content_hash"] or dataset_row["upload_time"]
+    cached = frame_cache.get_frame(dataset_row["id"], version)
+    if cached is not None:
+        return cached, []
+
+    column_rows = database.list_dataset_columns(dataset_row["id"])
+    if column_rows:
+        df, errors = columnar.decode_frame(column_rows), []
+    else:
+        # Datasets saved before columnar storage only have their CSV text.
+        df, errors = ingest_csv_stream(StringIO(dataset_row["raw_csv_text"]))
+
+    if errors or df is None:
+        return None, errors
+    frame = build_clean_frame(df)
+    if not frame.valid:
+        return None, ["Dataset is empty after cleaning."]
+    return frame_cache.put_frame(dataset_row["id"], version, frame), errors
+
+
 def render_admin_upload_and_save(user: dict) -> None:
     card(
         "Upload Dataset",
@@ -72,42 +142,54 @@ def render_admin_upload_and_save(user: dict) -> None:
     if not uploaded_file:
         return
 
-    start = perf_counter()
-    raw_text = uploaded_file.getvalue().decode("utf-8", errors="replace")
+    upload_token = f"{uploaded_file.name}:{uploaded_file.size}"
+    if (
+        st.session_state.get("upload_form_token") != upload_token
+        or st.session_state.last_upload_frame is None
+    ):
+        start = perf_counter()
+        progress = st.progress(0.0, text="Reading and cleaning CSV...")
+        uploaded_file.seek(0)
+        try:
+            cleaned_df, errors = ingest_csv_stream(
+                uploaded_file,
+                total_bytes=uploaded_file.size,
+                on_progress=lambda frac: progress.progress(
+                    frac, text=f"Reading and cleaning CSV... {frac:.0%}"
+                ),
+            )
+        except Exception as ex:
+            progress.empty()
+            st.error(f"Failed to parse CSV: {ex}")
+            return
+        progress.empty()
 
-    try:
-        raw_df = pd.read_csv(StringIO(raw_text))
-    except Exception as ex:
-        st.error(f"Failed to parse CSV: {ex}")
-        return
+        if errors:
+            for err in errors:
+                st.error(err)
+            return
+
+        elapsed_ms = (perf_counter() - start) * 1000
+        database.log_performance(user["id"], "upload_dataset", elapsed_ms)
 
-    upload_token = f"{uploaded_file.name}:{len(raw_text)}"
-    if st.session_state.get("upload_form_token") != upload_token:
         st.session_state["upload_form_token"] = upload_token
         st.session_state["dataset_name_input"] = uploaded_file.name
         st.session_state["assign_multiselect"] = []
 
-    cleaned_df, errors = clean_and_validate_dataset(raw_df)
-    if errors:
-        for err in errors:
-            st.error(err)
-        return
+        frame = frame_cache.share_frame(build_clean_frame(cleaned_df))
+        st.session_state.active_frame = frame
+        st.session_state.active_dataset_id = None
+        st.session_state.active_dataset_name = uploaded_file.name
+        st.session_state.active_dataset_source = "upload"
+        st.session_state.last_upload_frame = frame
+        st.session_state.last_upload_dataset_name = uploaded_file.name
 
-    elapsed_ms = (perf_counter() - start) * 1000
-    database.log_performance(user["id"], "upload_dataset", elapsed_ms)
+        prediction.train_and_store_model(frame, user_id=user["id"], force=True)
+        show_toast("Dataset uploaded and cleaned successfully.", "success")
 
     st.success("Dataset uploaded and cleaned successfully.")
-    show_toast("Dataset uploaded and cleaned successfully.", "success")
-    st.dataframe(cleaned_df.head(50), width="stretch")
-
-    st.session_state.active_df = cleaned_df
-    st.session_state.active_dataset_id = None
-    st.session_state.active_dataset_name = uploaded_file.name
-    st.session_state.active_dataset_source = "upload"
-    st.session_state.last_upload_csv_text = cleaned_df.to_csv(index=False)
-    st.session_state.last_upload_dataset_name = uploaded_file.name
-
-    prediction.train_and_store_model(cleaned_df, user_id=user["id"], force=True)
+    upload_frame = st.session_state.last_upload_frame
+    render_frame_preview(upload_frame.df, key="upload_preview", memo=upload_frame.derived)
 
     dataset_name = st.text_input(
         "Dataset name", value=uploaded_file.name, key="dataset_name_input"
@@ -124,11 +206,21 @@ def render_admin_upload_and_save(user: dict) -> None:
     if st.button("Save Dataset", width="stretch"):
         if not dataset_name.strip():
             st.error("Dataset name is required.")
-        elif not st.session_state.last_upload_csv_text:
+        elif st.session_state.last_upload_frame is None:
             st.error("No uploaded dataset found in session.")
         else:
+            # The session only keeps the float32 frame; the float64 cleaned columns are
+            # rebuilt from the upload (which Streamlit holds anyway) just for saving.
+            uploaded_file.seek(0)
+            cleaned_df, errors = ingest_csv_stream(uploaded_file)
+            if errors:
+                for err in errors:
+                    st.error(err)
+                return
             dataset_id = database.insert_dataset(
-                dataset_name.strip(), user["id"], st.session_state.last_upload_csv_text
+                dataset_name.strip(),
+                user["id"],
+                columnar.encode_frame(cleaned_df),
             )
             selected_ids = [analyst_options[label] for label in selected_labels]
             if selected_ids:
@@ -296,9 +388,8 @@ def render_assigned_dataset_selector(user: dict) -> None:
                 st.error("Dataset not found.")
                 return
 
-            df = pd.read_csv(StringIO(full_row["raw_csv_text"]))
-            cleaned_df, errors = clean_and_validate_dataset(df)
-            if errors or cleaned_df is None:
+            frame, errors = load_saved_dataset(full_row)
+            if errors or frame is None:
                 st.error("Saved dataset is invalid for current schema.")
                 for err in errors:
                     st.error(err)
@@ -307,26 +398,27 @@ def render_assigned_dataset_selector(user: dict) -> None:
             elapsed_ms = (perf_counter() - start) * 1000
             database.log_performance(user["id"], "load_dataset_from_db", elapsed_ms)
 
-            st.session_state.active_df = cleaned_df
+            st.session_state.active_frame = frame
             st.session_state.active_dataset_id = full_row["id"]
             st.session_state.active_dataset_name = full_row["dataset_name"]
             st.session_state.active_dataset_source = "database"
-            prediction.train_and_store_model(cleaned_df, user_id=user["id"], force=True)
+            prediction.train_and_store_model(frame, user_id=user["id"], force=True)
             st.success(f"Loaded dataset: {full_row['dataset_name']}")
             show_toast(f"Loaded dataset: {full_row['dataset_name']}", "success")
             st.rerun()
 
         if delete_clicked:
             database.delete_dataset(row["id"])
+            frame_cache.invalidate_dataset(row["id"])
             if st.session_state.active_dataset_id == row["id"]:
-                st.session_state.active_df = None
+                st.session_state.active_frame = None
                 st.session_state.active_dataset_id = None
                 st.session_state.active_dataset_name = None
                 st.session_state.active_dataset_source = None
                 st.session_state.model = None
                 st.session_state.model_metrics = None
                 st.session_state.model_feature_defaults = None
-                st.session_state.model_dataset_signature = None
+                st.session_state.model_dataset_fingerprint = None
             st.success("Dataset deleted.")
             show_toast("Dataset deleted.", "success")
             st.rerun()
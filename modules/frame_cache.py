@@ -0,0 +1,109 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from .clean_frame import CleanFrame
+
+
+FRAME_CACHE_MAX_BYTES = int(
+    os.environ.get("EARTHSCAPE_FRAME_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+
+# fingerprint -> (frame, nbytes of df and cube), least recently used first. Identical content
+# (two saved copies, or an upload of a saved dataset) shares one frame and so one set of
+# derived results. Each frame's derived memo counts towards the budget as well.
+_frames: "OrderedDict[str, tuple[CleanFrame, int]]" = OrderedDict()
+# (dataset_id, version) -> fingerprint, so a saved dataset is found without decoding it.
+_datasets: dict[tuple[int, str], str] = {}
+_base_bytes = 0
+_lock = threading.Lock()
+
+
+def _frame_bytes(frame: CleanFrame) -> int:
+    return int(frame.df.memory_usage(index=True, deep=True).sum()) + int(
+        frame.cube.memory_usage(index=True, deep=True).sum()
+    )
+
+
+def _total_bytes() -> int:
+    return _base_bytes + sum(frame.derived_bytes for frame, _ in _frames.values())
+
+
+def _evict_over_budget() -> None:
+    # Caller holds _lock. Memos grow after a frame is cached, so this runs on every growth.
+    global _base_bytes
+    total = _total_bytes()
+    while total > FRAME_CACHE_MAX_BYTES and _frames:
+        _, (frame, nbytes) = _frames.popitem(last=False)
+        _base_bytes -= nbytes
+        total -= nbytes + frame.derived_bytes
+
+
+def _derived_grew() -> None:
+    with _lock:
+        _evict_over_budget()
+
+
+def _lookup(fingerprint: Optional[str]) -> Optional[CleanFrame]:
+    entry = _frames.get(fingerprint) if fingerprint is not None else None
+    if entry is None:
+        return None
+    _frames.move_to_end(fingerprint)
+    return entry[0]
+
+
+def get_frame(dataset_id: int, version: str) -> Optional[CleanFrame]:
+    # version is the stored content hash, which equals the fingerprint of a frame built from
+    # the same columns, so another dataset or upload with this content is a hit too.
+    with _lock:
+        return _lookup(_datasets.get((dataset_id, version), version))
+
+
+def share_frame(frame: CleanFrame) -> CleanFrame:
+    """Return the cached frame with the same fingerprint, caching ``frame`` if there is none."""
+    # Clean frames are immutable (read-only columns), so one instance is shared by all sessions.
+    global _base_bytes
+    with _lock:
+        cached = _lookup(frame.fingerprint)
+        if cached is not None:
+            return cached
+
+    nbytes = _frame_bytes(frame)
+    if nbytes + frame.derived_bytes > FRAME_CACHE_MAX_BYTES:
+        return frame
+
+    with _lock:
+        cached = _lookup(frame.fingerprint)
+        if cached is not None:
+            return cached
+        _frames[frame.fingerprint] = (frame, nbytes)
+        _base_bytes += nbytes
+        _evict_over_budget()
+    frame.on_derived_growth(_derived_grew)
+    return frame
+
+
+def put_frame(dataset_id: int, version: str, frame: CleanFrame) -> CleanFrame:
+    frame = share_frame(frame)
+    with _lock:
+        _datasets[(dataset_id, version)] = frame.fingerprint
+    return frame
+
+
+def invalidate_dataset(dataset_id: int) -> None:
+    # Only the dataset's index entry goes; the frame may still back other datasets or
+    # uploads with the same content and ages out of the LRU on its own.
+    with _lock:
+        for key in [k for k in _datasets if k[0] == dataset_id]:
+            del _datasets[key]
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {
+            "entries": len(_frames),
+            "datasets": len(_datasets),
+            "bytes": _total_bytes(),
+            "max_bytes": FRAME_CACHE_MAX_BYTES,
+        }
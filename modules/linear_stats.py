@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class LinearStats:
+    """Mergeable sufficient statistics for least squares on ``features`` -> ``target``.
+
+    Holds the row count, the column means of Z = [X | y] and the centered scatter
+    ZᵀZ - n·z̄z̄ᵀ. That is the same information as XᵀX and Xᵀy, but it stays well
+    conditioned when features such as Year sit far from zero.
+    Appending rows or merging datasets adds matrices (Chan et al., as in ColumnStats), so
+    refitting costs O(new rows) and solving is a (p x p) system independent of history.
+    """
+
+    features: tuple[str, ...]
+    target: str
+    count: int
+    mean: np.ndarray
+    scatter: np.ndarray
+
+    @classmethod
+    def empty(cls, features: list[str], target: str) -> "LinearStats":
+        size = len(features) + 1
+        return cls(tuple(features), target, 0, np.zeros(size), np.zeros((size, size)))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, features: list[str], target: str) -> "LinearStats":
+        return cls.empty(features, target).update(df)
+
+    def _batch(self, df: pd.DataFrame) -> "LinearStats":
+        data = df[list(self.features) + [self.target]].to_numpy(dtype="float64")
+        if len(data) == 0:
+            return LinearStats.empty(list(self.features), self.target)
+        mean = data.mean(axis=0)
+        centered = data - mean
+        return LinearStats(self.features, self.target, len(data), mean, centered.T @ centered)
+
+    def merge(self, other: "LinearStats") -> "LinearStats":
+        if (other.features, other.target) != (self.features, self.target):
+            raise ValueError("Cannot merge statistics over different features or target.")
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        return LinearStats(
+            features=self.features,
+            target=self.target,
+            count=total,
+            mean=self.mean + delta * other.count / total,
+            scatter=self.scatter
+            + other.scatter
+            + np.outer(delta, delta) * self.count * other.count / total,
+        )
+
+    def update(self, df: pd.DataFrame) -> "LinearStats":
+        return self.merge(self._batch(df))
+
+    def solve(self, ridge: float = 0.0) -> "LinearModel":
+        # Normal equations on centered data; lstsq keeps constant or collinear features
+        # (e.g. a single-month file) from making the system singular.
+        p = len(self.features)
+        sxx = self.scatter[:p, :p] + ridge * np.eye(p)
+        sxy = self.scatter[:p, p]
+        coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+        intercept = float(self.mean[p] - self.mean[:p] @ coef)
+        return LinearModel(
+            features=self.features, coef_=coef, intercept_=intercept, stats=self, ridge=ridge
+        )
+
+
+@dataclass(frozen=True)
+class LinearModel:
+    """Solved coefficients plus the statistics they came from, so the fit can be extended."""
+
+    features: tuple[str, ...]
+    coef_: np.ndarray
+    intercept_: float
+    stats: LinearStats
+    ridge: float = 0.0
+
+    def predict(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[list(self.features)]
+        return np.asarray(X, dtype="float64") @ self.coef_ + self.intercept_
+
+    def update(self, df: pd.DataFrame) -> "LinearModel":
+        return self.stats.update(df).solve(self.ridge)
@@ -0,0 +1,179 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.linear_model import Ridge
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import KFold, TimeSeriesSplit
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from .linear_stats import LinearStats
+
+
+DEFAULT_FOLDS = 5
+EVAL_TIME_BUDGET_S = 20.0
+# Larger frames are scored on a fixed random sample; CV noise is no longer the issue there.
+EVAL_MAX_ROWS = 200_000
+LEADERBOARD_COLUMNS = ["model", "folds", "mae", "mae_std", "rmse", "rmse_std", "r2", "fit_seconds", "status"]
+
+
+class SufficientStatsRegressor:
+    """Closed-form linear fit from LinearStats behind the fit/predict interface."""
+
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> "SufficientStatsRegressor":
+        target = "__target__"
+        self.model_ = LinearStats.from_frame(X.assign(**{target: y.to_numpy()}), list(X.columns), target).solve()
+        return self
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.model_.predict(X)
+
+
+class SeasonalBaseline:
+    """Predicts the training mean of the target for each calendar month (climatology)."""
+
+    def fit(self, X: pd.DataFrame, y: pd.Series) -> "SeasonalBaseline":
+        months = X["Month"].to_numpy().astype(np.intp)
+        values = y.to_numpy(dtype="float64")
+        counts = np.bincount(months, minlength=13)
+        sums = np.bincount(months, weights=values, minlength=13)
+        self.overall_ = float(values.mean())
+        self.means_ = np.where(counts > 0, sums / np.maximum(counts, 1), self.overall_)
+        return self
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        return self.means_[X["Month"].to_numpy().astype(np.intp)]
+
+
+@dataclass(frozen=True)
+class Candidate:
+    label: str
+    build: Callable[[], Any]
+
+
+CANDIDATES = {
+    "linear": Candidate("Linear (sufficient stats)", SufficientStatsRegressor),
+    "ridge": Candidate("Ridge (standardized, alpha=1)", lambda: make_pipeline(StandardScaler(), Ridge(alpha=1.0))),
+    "gradient_boosting": Candidate(
+        "Gradient boosting", lambda: HistGradientBoostingRegressor(max_iter=200, random_state=42)
+    ),
+    "seasonal_baseline": Candidate("Seasonal baseline (monthly mean)", SeasonalBaseline),
+}
+
+SPLIT_SCHEMES = {
+    "kfold": "Shuffled K-fold",
+    "time_series": "Time-series (expanding window)",
+}
+
+
+def _time_order(df: pd.DataFrame) -> np.ndarray:
+    return np.lexsort((df["Month"].to_numpy(), df["Year"].to_numpy()))
+
+
+def cv_splits(df: pd.DataFrame, scheme: str, folds: int) -> list[tuple[np.ndarray, np.ndarray]]:
+    """Row-position (train, test) pairs; empty when the frame is too small to split."""
+    n = len(df)
+    if scheme == "kfold":
+        folds = min(folds, n)
+        if folds < 2:
+            return []
+        return list(KFold(n_splits=folds, shuffle=True, random_state=42).split(np.arange(n)))
+    if scheme == "time_series":
+        # Train on everything before each test block, so no fold sees its own future.
+        folds = min(folds, n - 1)
+        if folds < 2:
+            return []
+        order = _time_order(df)
+        return [(order[train], order[test]) for train, test in TimeSeriesSplit(n_splits=folds).split(order)]
+    raise ValueError(f"Unknown split scheme: {scheme}")
+
+
+def _score_fold(
+    name: str, X: pd.DataFrame, y: pd.Series, train: np.ndarray, test: np.ndarray
+) -> dict:
+    start = perf_counter()
+    # Folds already run in parallel; one OpenMP thread per fit keeps gradient boosting from
+    # starting a full thread team in every worker (the limit applies to this thread only).
+    with threadpool_limits(limits=1, user_api="openmp"):
+        model = CANDIDATES[name].build().fit(X.iloc[train], y.iloc[train])
+        predicted = model.predict(X.iloc[test])
+    actual = y.iloc[test]
+    return {
+        "mae": float(mean_absolute_error(actual, predicted)),
+        "rmse": float(np.sqrt(mean_squared_error(actual, predicted))),
+        "r2": float(r2_score(actual, predicted)) if len(test) > 1 else np.nan,
+        "seconds": perf_counter() - start,
+    }
+
+
+def evaluate_models(
+    df: pd.DataFrame,
+    features: list[str],
+    target: str,
+    scheme: str = "kfold",
+    folds: int = DEFAULT_FOLDS,
+    candidates: list[str] | None = None,
+    time_budget_s: float = EVAL_TIME_BUDGET_S,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Cross-validate candidates and return a leaderboard sorted by mean RMSE.
+
+    Every (candidate, fold) fit runs on a thread pool (NumPy and scikit-learn release the
+    GIL in their fitting loops). Fits still pending when the budget runs out are
+    cancelled, and a candidate that completed only some folds is marked "partial".
+    """
+    if len(df) > EVAL_MAX_ROWS:
+        df = df.sample(EVAL_MAX_ROWS, random_state=42)
+    X = df[features].reset_index(drop=True)
+    y = df[target].reset_index(drop=True)
+    splits = cv_splits(df, scheme, folds)
+    names = list(candidates or CANDIDATES)
+    if not splits:
+        return pd.DataFrame(columns=LEADERBOARD_COLUMNS)
+
+    results: dict[str, list[dict]] = {name: [] for name in names}
+    deadline = perf_counter() + time_budget_s
+    pool = ThreadPoolExecutor(max_workers=workers or min(len(names) * len(splits), os.cpu_count() or 1))
+    try:
+        pending = {
+            pool.submit(_score_fold, name, X, y, train, test): name
+            for name in names
+            for train, test in splits
+        }
+        while pending:
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)].append(future.result())
+    finally:
+        # Fits already running finish in the background; their results are discarded.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    rows = []
+    for name in names:
+        scores = pd.DataFrame(results[name], columns=["mae", "rmse", "r2", "seconds"])
+        done = len(scores)
+        rows.append(
+            {
+                "model": CANDIDATES[name].label,
+                "folds": f"{done}/{len(splits)}",
+                "mae": scores["mae"].mean(),
+                "mae_std": scores["mae"].std(ddof=0),
+                "rmse": scores["rmse"].mean(),
+                "rmse_std": scores["rmse"].std(ddof=0),
+                "r2": scores["r2"].mean(),
+                "fit_seconds": scores["seconds"].sum() if done else np.nan,
+                "status": "complete" if done == len(splits) else ("partial" if done else "timed out"),
+            }
+        )
+    leaderboard = pd.DataFrame(rows, columns=LEADERBOARD_COLUMNS)
+    return leaderboard.sort_values("rmse", na_position="last", ignore_index=True)
@@ -0,0 +1,82 @@
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from . import database
+
+
+MODEL_CACHE_MAX_ENTRIES = int(os.environ.get("EARTHSCAPE_MODEL_CACHE_MAX_ENTRIES", "32"))
+
+
+@dataclass(frozen=True)
+class RegisteredModel:
+    model: Any
+    metrics: dict
+    feature_defaults: dict
+
+
+ModelKey = tuple[str, str, str]
+
+# (content_hash, feature_set, model_type) -> model, least recently used first.
+_models: "OrderedDict[ModelKey, RegisteredModel]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def model_key(content_hash: str, features: list[str], model_type: str) -> ModelKey:
+    return (content_hash, ",".join(features), model_type)
+
+
+def _remember(key: ModelKey, entry: RegisteredModel) -> RegisteredModel:
+    with _lock:
+        _models[key] = entry
+        _models.move_to_end(key)
+        while len(_models) > MODEL_CACHE_MAX_ENTRIES:
+            _models.popitem(last=False)
+    return entry
+
+
+def get_model(key: ModelKey) -> Optional[RegisteredModel]:
+    with _lock:
+        entry = _models.get(key)
+        if entry is not None:
+            _models.move_to_end(key)
+            return entry
+
+    # Not in this process yet: load lazily from storage, so restarts and other replicas reuse fits.
+    row = database.get_model_artifact(*key)
+    if row is None:
+        return None
+    # Blobs are only ever written by put_model from this app's own database.
+    entry = RegisteredModel(
+        model=pickle.loads(bytes(row["model_blob"])),
+        metrics=json.loads(row["metrics_json"]),
+        feature_defaults=json.loads(row["feature_defaults_json"]),
+    )
+    return _remember(key, entry)
+
+
+def put_model(key: ModelKey, entry: RegisteredModel) -> RegisteredModel:
+    database.insert_model_artifact(
+        *key,
+        model_blob=pickle.dumps(entry.model, protocol=pickle.HIGHEST_PROTOCOL),
+        metrics_json=json.dumps(entry.metrics),
+        feature_defaults_json=json.dumps(entry.feature_defaults),
+    )
+    return _remember(key, entry)
+
+
+def get_or_train(key: ModelKey, train: Callable[[], RegisteredModel]) -> tuple[RegisteredModel, bool]:
+    """Return (model, trained): the registered model for ``key``, fitting and storing it if missing."""
+    entry = get_model(key)
+    if entry is not None:
+        return entry, False
+    return put_model(key, train()), True
+
+
+def cache_stats() -> dict:
+    with _lock:
+        return {"entries": len(_models), "max_entries": MODEL_CACHE_MAX_ENTRIES}
@@ -41,11 +41,13 @@ def render_performance_page(user: dict) -> None:
     )
     avg_df["avg_execution_time_ms"] = avg_df["avg_execution_time_ms"].round(3)
 
-    c1, c2 = st.columns(2)
+    c1, c2, c3 = st.columns(3)
     with c1:
         st.metric("Total Logged Actions", len(df))
     with c2:
         st.metric("Overall Avg Time (ms)", f"{df['execution_time_ms'].mean():.3f}")
+    with c3:
+        st.metric("Dropped Log Entries", database.performance_log_drop_count())
 
     st.markdown("### Average Execution Time Per Action")
     st.dataframe(avg_df, width="stretch")
@@ -3,130 +3,198 @@ from time import perf_counter
 import numpy as np
 import pandas as pd
 import streamlit as st
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-from sklearn.model_selection import train_test_split
 
-from . import database
+from . import database, model_registry
+from .clean_frame import CleanFrame
+from .linear_stats import LinearStats
+from .model_eval import CANDIDATES, DEFAULT_FOLDS, EVAL_TIME_BUDGET_S, SPLIT_SCHEMES, evaluate_models
+from .model_registry import RegisteredModel
+from .preview import render_frame_preview
 from .utils import show_toast
 
 
 FEATURE_COLUMNS = ["Year", "Month", "Rainfall", "CO2", "Humidity", "WindSpeed"]
 TARGET = "Temperature"
 MODEL_MIN_ROWS = 2
+MODEL_TYPE = "linear_sufficient_stats"
+PREDICTION_COLUMN = "Predicted_Temperature"
+BATCH_MAX_ROWS = 1_000_000
 
 
-def _dataset_signature(df: pd.DataFrame) -> tuple:
-    if df is None or df.empty:
-        return (0, 0, None, None)
-    numeric_year = pd.to_numeric(df.get("Year"), errors="coerce")
-    return (
-        int(len(df)),
-        int(len(df.columns)),
-        int(numeric_year.min()) if numeric_year.notna().any() else None,
-        int(numeric_year.max()) if numeric_year.notna().any() else None,
-    )
-
+def _clear_session_model(fingerprint: str | None = None) -> None:
+    st.session_state.model = None
+    st.session_state.model_metrics = None
+    st.session_state.model_feature_defaults = None
+    st.session_state.model_dataset_fingerprint = fingerprint
 
-def _prepare_prediction_frame(df: pd.DataFrame) -> pd.DataFrame:
-    work = df.copy()
-    for col in FEATURE_COLUMNS + [TARGET]:
-        work[col] = pd.to_numeric(work[col], errors="coerce")
 
-    work = work.dropna(subset=FEATURE_COLUMNS + [TARGET])
-    work = work[(work["Month"] >= 1) & (work["Month"] <= 12)]
-    return work
+def _fit_linear_model(work: pd.DataFrame) -> RegisteredModel:
+    # Closed-form fit on every row; the stats travel with the model so later rows can be
+    # folded in with model.update(new_rows). Model quality comes from the cross-validated
+    # comparison on the page, not from a holdout taken out of the deployed fit.
+    model = LinearStats.from_frame(work, FEATURE_COLUMNS, TARGET).solve()
+    metrics = {"rows": int(len(work))}
+    feature_defaults = {
+        "Year": int(work["Year"].median()),
+        "Month": int(work["Month"].median()),
+        "Rainfall": float(work["Rainfall"].median()),
+        "CO2": float(work["CO2"].median()),
+        "Humidity": float(work["Humidity"].median()),
+        "WindSpeed": float(work["WindSpeed"].median()),
+    }
+    return RegisteredModel(model=model, metrics=metrics, feature_defaults=feature_defaults)
 
 
-def train_and_store_model(df: pd.DataFrame, user_id: int | None = None, force: bool = False) -> bool:
-    if df is None or df.empty:
-        st.session_state.model = None
-        st.session_state.model_metrics = None
-        st.session_state.model_feature_defaults = None
-        st.session_state.model_dataset_signature = None
+def train_and_store_model(frame: CleanFrame | None, user_id: int | None = None, force: bool = False) -> bool:
+    # force skips the per-session shortcut; the shared model registry is still consulted,
+    # so opening a dataset only fits a model the first time its content is seen.
+    if frame is None or not frame.valid:
+        _clear_session_model()
         return False
 
-    signature = _dataset_signature(df)
+    work = frame.df
     if not force and st.session_state.get("model") is not None:
-        if st.session_state.get("model_dataset_signature") == signature:
+        if st.session_state.get("model_dataset_fingerprint") == frame.fingerprint:
             return True
 
-    start = perf_counter()
-    work = _prepare_prediction_frame(df)
-
     if len(work) < MODEL_MIN_ROWS:
-        st.session_state.model = None
-        st.session_state.model_metrics = None
-        st.session_state.model_feature_defaults = None
-        st.session_state.model_dataset_signature = signature
+        _clear_session_model(frame.fingerprint)
         return False
 
-    X = work[FEATURE_COLUMNS]
-    y = work[TARGET]
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X,
-        y,
-        test_size=0.2,
-        random_state=42,
-    )
+    start = perf_counter()
+    key = model_registry.model_key(frame.fingerprint, FEATURE_COLUMNS, MODEL_TYPE)
+    entry, trained = model_registry.get_or_train(key, lambda: _fit_linear_model(work))
 
-    model = LinearRegression()
-    model.fit(X_train, y_train)
-
-    y_pred = model.predict(X_test)
-    mae = mean_absolute_error(y_test, y_pred)
-    rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-    r2 = r2_score(y_test, y_pred) if len(y_test) > 1 else None
-
-    st.session_state.model = model
-    st.session_state.model_metrics = {
-        "mae": float(mae),
-        "rmse": float(rmse),
-        "r2": None if r2 is None else float(r2),
-        "rows": int(len(work)),
-        "train_rows": int(len(X_train)),
-        "test_rows": int(len(X_test)),
-    }
-    st.session_state.model_feature_defaults = {
-        "Year": int(work["Year"].median()),
-        "Month": int(work["Month"].median()),
-        "Rainfall": float(work["Rainfall"].median()),
-        "CO2": float(work["CO2"].median()),
-        "Humidity": float(work["Humidity"].median()),
-        "WindSpeed": float(work["WindSpeed"].median()),
-    }
-    st.session_state.model_dataset_signature = signature
+    st.session_state.model = entry.model
+    st.session_state.model_metrics = entry.metrics
+    st.session_state.model_feature_defaults = entry.feature_defaults
+    st.session_state.model_dataset_fingerprint = frame.fingerprint
 
     elapsed_ms = (perf_counter() - start) * 1000
-    database.log_performance(user_id, "train_prediction_model", elapsed_ms)
+    action = "train_prediction_model" if trained else "load_prediction_model"
+    database.log_performance(user_id, action, elapsed_ms)
     return True
 
 
-def render_prediction_page(df: pd.DataFrame, user_id: int) -> None:
+def _leaderboard_key(scheme: str, folds: int) -> tuple:
+    return ("model_leaderboard", scheme, folds)
+
+
+def cached_leaderboard(frame: CleanFrame, scheme: str, folds: int) -> pd.DataFrame | None:
+    return frame.peek_derived(_leaderboard_key(scheme, folds))
+
+
+def model_leaderboard(frame: CleanFrame, scheme: str, folds: int, user_id: int | None = None) -> pd.DataFrame:
+    # Cross-validation depends only on the data and the split, so it runs once per frame.
+    def build() -> pd.DataFrame:
+        start = perf_counter()
+        leaderboard = evaluate_models(frame.df, FEATURE_COLUMNS, TARGET, scheme, folds)
+        database.log_performance(user_id, "evaluate_models", (perf_counter() - start) * 1000)
+        return leaderboard
+
+    return frame.derived(_leaderboard_key(scheme, folds), build, keep=True)
+
+
+def batch_features(df: pd.DataFrame, defaults: dict) -> tuple[pd.DataFrame | None, list[str], list[str]]:
+    """Validate an uploaded scenario table; returns (rows, filled feature columns, errors).
+
+    Feature columns missing from the upload are held at the dataset defaults; rows with a
+    non-numeric feature value are dropped.
+    """
+    present = [col for col in FEATURE_COLUMNS if col in df.columns]
+    if not present:
+        return None, [], [f"CSV needs at least one feature column: {', '.join(FEATURE_COLUMNS)}."]
+    if len(df) > BATCH_MAX_ROWS:
+        return None, [], [f"CSV has {len(df)} rows; the limit is {BATCH_MAX_ROWS}."]
+
+    rows = df.copy()
+    filled = [col for col in FEATURE_COLUMNS if col not in rows.columns]
+    for col in present:
+        rows[col] = pd.to_numeric(rows[col], errors="coerce")
+    rows = rows.dropna(subset=present).reset_index(drop=True)
+    for col in filled:
+        rows[col] = defaults[col]
+    if rows.empty:
+        return None, filled, ["No rows with numeric feature values."]
+    return rows, filled, []
+
+
+def scenario_grid(years: np.ndarray, months: list[int], co2_values: np.ndarray, defaults: dict) -> pd.DataFrame:
+    # Cartesian product of the swept features; everything else held at the dataset defaults.
+    year_grid, month_grid, co2_grid = np.meshgrid(years, months, co2_values, indexing="ij")
+    grid = pd.DataFrame(
+        {
+            "Year": year_grid.ravel(),
+            "Month": month_grid.ravel(),
+            "CO2": co2_grid.ravel(),
+        }
+    )
+    for col in FEATURE_COLUMNS:
+        if col not in grid.columns:
+            grid[col] = defaults[col]
+    return grid
+
+
+def predict_batch(model, rows: pd.DataFrame) -> pd.DataFrame:
+    # One vectorized predict over every row; the original columns are kept for the export.
+    features = rows[FEATURE_COLUMNS].astype("float64")
+    result = rows.copy()
+    result[PREDICTION_COLUMN] = model.predict(features)
+    return result
+
+
+def render_prediction_page(frame: CleanFrame, user_id: int) -> None:
     st.subheader("ML Prediction")
     st.caption(
-        "Model: Linear Regression trained once per loaded dataset using Year, Month, Rainfall, CO2, Humidity, WindSpeed."
+        "Model: Linear Regression (closed form from XᵀX/Xᵀy statistics) using Year, Month, Rainfall, CO2, Humidity, WindSpeed, trained once per dataset content and reused across sessions."
     )
 
-    ready = train_and_store_model(df, user_id=user_id, force=False)
+    ready = train_and_store_model(frame, user_id=user_id, force=False)
     if not ready or st.session_state.get("model") is None:
         st.warning("Not enough clean data to train model. Need at least 2 valid rows.")
         return
 
-    metrics = st.session_state.get("model_metrics") or {}
     defaults = st.session_state.get("model_feature_defaults") or {}
 
-    st.markdown("### Model Metrics")
-    c1, c2, c3 = st.columns(3)
-    c1.metric("MAE", f"{metrics.get('mae', 0.0):.3f}")
-    c2.metric("RMSE", f"{metrics.get('rmse', 0.0):.3f}")
-    r2_val = metrics.get("r2")
-    c3.metric("R2", "N/A" if r2_val is None else f"{r2_val:.3f}")
+    st.markdown("### Model Comparison")
+    # Cross-validation can take up to EVAL_TIME_BUDGET_S, so it only runs on request; the
+    # form keeps scheme and fold changes from rerunning the page.
+    with st.form("model_eval_form"):
+        e1, e2 = st.columns(2)
+        with e1:
+            scheme = st.selectbox(
+                "Validation",
+                list(SPLIT_SCHEMES),
+                format_func=SPLIT_SCHEMES.get,
+                key="model_eval_scheme",
+            )
+        with e2:
+            folds = st.slider("Folds", min_value=3, max_value=10, value=DEFAULT_FOLDS, key="model_eval_folds")
+        run_comparison = st.form_submit_button("Run Comparison", width="stretch")
 
-    st.caption(
-        f"Training rows: {metrics.get('train_rows', 0)} | Test rows: {metrics.get('test_rows', 0)}"
-    )
+    if run_comparison:
+        with st.spinner("Cross-validating models..."):
+            leaderboard = model_leaderboard(frame, scheme, folds, user_id)
+    else:
+        leaderboard = cached_leaderboard(frame, scheme, folds)
+
+    if leaderboard is None:
+        st.info(
+            f"Press Run Comparison to cross-validate the candidate models (up to {EVAL_TIME_BUDGET_S:.0f} s)."
+        )
+    elif leaderboard.empty:
+        st.warning("Not enough rows to cross-validate; need at least 3.")
+    else:
+        deployed = leaderboard[leaderboard["model"] == CANDIDATES["linear"].label].iloc[0]
+        c1, c2, c3 = st.columns(3)
+        c1.metric("MAE", f"{deployed['mae']:.3f}", help=f"± {deployed['mae_std']:.3f} across folds")
+        c2.metric("RMSE", f"{deployed['rmse']:.3f}", help=f"± {deployed['rmse_std']:.3f} across folds")
+        c3.metric("R2", "N/A" if pd.isna(deployed["r2"]) else f"{deployed['r2']:.3f}")
+        st.dataframe(leaderboard, width="stretch", hide_index=True)
+        st.caption(
+            f"Mean ± std across {folds} folds ({SPLIT_SCHEMES[scheme]}). Predictions below use "
+            f"{CANDIDATES['linear'].label}; tiles show its scores."
+        )
 
     st.markdown("### Predict Temperature")
     with st.form("predict_form_multivariate"):
@@ -192,3 +260,107 @@ def render_prediction_page(df: pd.DataFrame, user_id: int) -> None:
 
         elapsed_ms = (perf_counter() - start) * 1000
         database.log_performance(user_id, "generate_prediction", elapsed_ms)
+
+    _render_batch_prediction(user_id, defaults)
+
+
+def _render_batch_prediction(user_id: int, defaults: dict) -> None:
+    st.markdown("### Batch Prediction")
+    source = st.radio(
+        "Scenario source",
+        ["Upload CSV", "Parameter grid"],
+        horizontal=True,
+        key="batch_prediction_source",
+    )
+
+    rows, token = None, None
+    if source == "Upload CSV":
+        uploaded = st.file_uploader(
+            "Upload scenario CSV (any of: " + ", ".join(FEATURE_COLUMNS) + ")",
+            type=["csv"],
+            key="batch_prediction_upload",
+        )
+        if uploaded is not None:
+            token = ("upload", uploaded.file_id)
+            if (st.session_state.get("batch_prediction") or {}).get("token") != token:
+                try:
+                    scenarios = pd.read_csv(uploaded)
+                except Exception as ex:
+                    st.error(f"Failed to parse CSV: {ex}")
+                    return
+                rows, filled, errors = batch_features(scenarios, defaults)
+                for err in errors:
+                    st.error(err)
+                if filled:
+                    st.caption("Held at dataset defaults: " + ", ".join(filled))
+                if rows is not None and len(rows) < len(scenarios):
+                    st.caption(f"Skipped {len(scenarios) - len(rows)} rows with non-numeric feature values.")
+    else:
+        with st.form("batch_prediction_grid"):
+            g1, g2, g3 = st.columns(3)
+            with g1:
+                year_from = st.number_input(
+                    "Year from",
+                    min_value=1900,
+                    max_value=3000,
+                    value=int(defaults.get("Year", 2026)),
+                    step=1,
+                )
+                year_to = st.number_input(
+                    "Year to",
+                    min_value=1900,
+                    max_value=3000,
+                    value=int(defaults.get("Year", 2026)) + 25,
+                    step=1,
+                )
+                year_step = st.number_input("Year step", min_value=1, max_value=100, value=1, step=1)
+            with g2:
+                months = st.multiselect("Months", list(range(1, 13)), default=list(range(1, 13)))
+            with g3:
+                co2_default = float(defaults.get("CO2", 400.0))
+                co2_from = st.number_input("CO2 from", value=co2_default, step=10.0)
+                co2_to = st.number_input("CO2 to", value=co2_default + 200.0, step=10.0)
+                co2_step = st.number_input("CO2 step", min_value=0.1, value=10.0, step=1.0)
+            st.caption("Rainfall, Humidity and WindSpeed are held at the dataset medians.")
+            generate = st.form_submit_button("Generate and Predict", width="stretch")
+
+        if generate:
+            years = np.arange(int(year_from), int(year_to) + 1, int(year_step))
+            co2_values = np.arange(float(co2_from), float(co2_to) + co2_step / 2, float(co2_step))
+            size = len(years) * len(months) * len(co2_values)
+            if size == 0:
+                st.error("The grid is empty; check the ranges and pick at least one month.")
+            elif size > BATCH_MAX_ROWS:
+                st.error(f"The grid has {size} rows; the limit is {BATCH_MAX_ROWS}.")
+            else:
+                token = ("grid", year_from, year_to, year_step, tuple(months), co2_from, co2_to, co2_step)
+                rows = scenario_grid(years, months, co2_values, defaults)
+
+    if rows is not None:
+        start = perf_counter()
+        result = predict_batch(st.session_state.model, rows)
+        st.session_state.batch_prediction = {
+            "token": token,
+            "fingerprint": st.session_state.get("model_dataset_fingerprint"),
+            "result": result,
+        }
+        elapsed_ms = (perf_counter() - start) * 1000
+        database.log_performance(user_id, "generate_batch_prediction", elapsed_ms)
+        show_toast(f"Predicted {len(result)} scenarios.", "success")
+
+    batch = st.session_state.get("batch_prediction")
+    # Results from another dataset's model are stale; they are not shown or downloadable.
+    if not batch or batch["fingerprint"] != st.session_state.get("model_dataset_fingerprint"):
+        return
+
+    result = batch["result"]
+    st.caption(f"{len(result)} scenarios predicted.")
+    render_frame_preview(result, key="batch_prediction_preview")
+    st.download_button(
+        label="Download Predictions CSV",
+        # Serialized only when the button is clicked, not on every rerun.
+        data=lambda: result.to_csv(index=False),
+        file_name="temperature_predictions.csv",
+        mime="text/csv",
+        width="stretch",
+    )
@@ -0,0 +1,116 @@
+from typing import Any, Callable, Hashable, Optional
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+PREVIEW_PAGE_SIZES = [25, 50, 100, 250, 500]
+NO_COLUMN = "(none)"
+
+Memo = Callable[[Hashable, Callable[[], Any]], Any]
+
+
+def _sort_order(df: pd.DataFrame, column: str, ascending: bool) -> np.ndarray:
+    values = df[column]
+    if pd.api.types.is_numeric_dtype(values):
+        order = np.argsort(values.to_numpy(), kind="stable")
+        return order if ascending else order[::-1]
+    # Text columns (e.g. uploaded ones kept by predict_batch) may mix str, numbers and
+    # None, which np.argsort cannot compare: sort as text with missing values last.
+    as_text = values.reset_index(drop=True)
+    as_text = as_text.where(as_text.isna(), as_text.astype(str))
+    return as_text.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+
+def page_rows(
+    df: pd.DataFrame,
+    order: Optional[np.ndarray],
+    mask: Optional[np.ndarray],
+    page: int,
+    page_size: int,
+) -> tuple[pd.DataFrame, int]:
+    # Sort/filter become integer positions; only the visible page is materialized.
+    if order is None:
+        positions = np.flatnonzero(mask) if mask is not None else None
+    else:
+        positions = order[mask[order]] if mask is not None else order
+    total = len(df) if positions is None else len(positions)
+    start = (page - 1) * page_size
+    if positions is None:
+        return df.iloc[start : start + page_size], total
+    return df.iloc[positions[start : start + page_size]], total
+
+
+def render_frame_preview(
+    df: pd.DataFrame,
+    key: str,
+    memo: Optional[Memo] = None,
+    memo_key: Hashable = None,
+    default_page_size: int = 50,
+    height: Optional[int] = None,
+) -> None:
+    """Paginated st.dataframe that sends only the visible slice to the browser.
+
+    Sorting and the numeric range filter run server-side on the cached frame; pass
+    ``memo`` (e.g. ``CleanFrame.derived``) with a ``memo_key`` identifying ``df`` to keep
+    sort orders across reruns.
+    """
+    if df.empty:
+        st.dataframe(df, width="stretch")
+        return
+
+    columns = list(df.columns)
+    numeric_columns = [column for column in columns if pd.api.types.is_numeric_dtype(df[column])]
+    c1, c2, c3, c4 = st.columns([2, 1, 2, 1])
+    with c1:
+        sort_column = st.selectbox("Sort by", [NO_COLUMN] + columns, key=f"{key}_sort")
+    with c2:
+        ascending = st.toggle("Ascending", value=True, key=f"{key}_ascending")
+    with c3:
+        filter_column = st.selectbox(
+            "Filter column", [NO_COLUMN] + numeric_columns, key=f"{key}_filter"
+        )
+    with c4:
+        page_size = st.selectbox(
+            "Rows per page",
+            PREVIEW_PAGE_SIZES,
+            index=PREVIEW_PAGE_SIZES.index(default_page_size),
+            key=f"{key}_page_size",
+        )
+
+    mask = None
+    if filter_column != NO_COLUMN:
+        values = df[filter_column].to_numpy()
+        col_min, col_max = float(df[filter_column].min()), float(df[filter_column].max())
+        f1, f2 = st.columns(2)
+        with f1:
+            low = st.number_input("Min", value=col_min, key=f"{key}_filter_min_{filter_column}")
+        with f2:
+            high = st.number_input("Max", value=col_max, key=f"{key}_filter_max_{filter_column}")
+        mask = (values >= low) & (values <= high)
+
+    order = None
+    if sort_column != NO_COLUMN:
+        build = lambda: _sort_order(df, sort_column, ascending)
+        if memo is None:
+            order = build()
+        else:
+            order = memo(("preview_order", memo_key, sort_column, ascending), build)
+
+    total = len(df) if mask is None else int(mask.sum())
+    pages = max(1, -(-total // page_size))
+    # No max_value: the page count changes with filters, and an out-of-range stored value
+    # is clamped here instead of raising.
+    page = st.number_input(f"Page (of {pages})", min_value=1, value=1, step=1, key=f"{key}_page")
+    page = min(int(page), pages)
+
+    rows, total = page_rows(df, order, mask, page, page_size)
+    if height is None:
+        st.dataframe(rows, width="stretch")
+    else:
+        st.dataframe(rows, width="stretch", height=height)
+    first = 0 if total == 0 else (page - 1) * page_size + 1
+    last = min(page * page_size, total)
+    suffix = "" if total == len(df) else f" (filtered from {len(df)})"
+    st.caption(f"Rows {first}-{last} of {total}{suffix}")
@@ -3,45 +3,37 @@ from time import perf_counter
 import pandas as pd
 import streamlit as st
 
+from . import aggregates
 from . import database
-from .dashboard import detect_anomalies
+from .clean_frame import CleanFrame
+from .anomalies import zscore_thresholds
+from .dashboard import anomaly_scores
 
 
-def render_reports_page(df: pd.DataFrame, dataset_name: str, user_id: int) -> None:
+def render_reports_page(frame: CleanFrame, dataset_name: str, user_id: int) -> None:
     st.subheader("Reports")
     st.caption(f"Dataset: {dataset_name}")
 
-    report_df = df.copy()
-    for col in ["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]:
-        report_df[col] = pd.to_numeric(report_df[col], errors="coerce")
-    report_df = report_df.dropna(
-        subset=["Year", "Month", "Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
-    )
-    report_df = report_df[(report_df["Month"] >= 1) & (report_df["Month"] <= 12)]
-
-    if report_df.empty:
+    if not frame.valid:
         st.warning("No clean rows available for report generation.")
         return
 
-    aggregate_report = (
-        report_df.groupby(["Year", "Month"], as_index=False)[
-            ["Temperature", "Rainfall", "CO2", "Humidity", "WindSpeed"]
-        ]
-        .mean()
-        .sort_values(["Year", "Month"])
-    )
-    anomalies = detect_anomalies(report_df, temp_thresh=2.0, rain_thresh=2.0, co2_thresh=2.0)
+    cube = frame.cube
+    aggregate_report = aggregates.monthly_means(cube)
+    stats = aggregates.summary_stats(cube)
+    year_min, year_max = aggregates.year_bounds(cube)
+    anomalies = anomaly_scores(frame, year_min, year_max).flagged(frame.df, zscore_thresholds())
 
     summary_lines = [
         f"Dataset: {dataset_name}",
-        f"Total rows: {len(report_df)}",
-        f"Year range: {int(report_df['Year'].min())} - {int(report_df['Year'].max())}",
-        f"Avg Temperature: {report_df['Temperature'].mean():.2f}",
-        f"Max Temperature: {report_df['Temperature'].max():.2f}",
-        f"Avg Rainfall: {report_df['Rainfall'].mean():.2f}",
-        f"Avg CO2: {report_df['CO2'].mean():.2f}",
-        f"Avg Humidity: {report_df['Humidity'].mean():.2f}",
-        f"Avg WindSpeed: {report_df['WindSpeed'].mean():.2f}",
+        f"Total rows: {aggregates.row_count(cube)}",
+        f"Year range: {year_min} - {year_max}",
+        f"Avg Temperature: {stats.at['Temperature', 'mean']:.2f}",
+        f"Max Temperature: {stats.at['Temperature', 'max']:.2f}",
+        f"Avg Rainfall: {stats.at['Rainfall', 'mean']:.2f}",
+        f"Avg CO2: {stats.at['CO2', 'mean']:.2f}",
+        f"Avg Humidity: {stats.at['Humidity', 'mean']:.2f}",
+        f"Avg WindSpeed: {stats.at['WindSpeed', 'mean']:.2f}",
         f"Anomalies detected: {len(anomalies)}",
     ]
     summary_text = "\n".join(summary_lines)
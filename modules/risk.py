@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+RISK_GRID_POINTS = 50
+
+
+@dataclass(frozen=True)
+class RiskType:
+    label: str
+    column: str
+    # "above": risk when value > threshold; "below": risk when value < threshold.
+    direction: str
+    default_threshold: float
+
+
+RISK_TYPES = {
+    "heatwave": RiskType("Heatwave", "Temperature", "above", 36.0),
+    "flood": RiskType("Flood", "Rainfall", "above", 30.0),
+    "drought": RiskType("Drought", "Rainfall", "below", 5.0),
+    "high_wind": RiskType("High wind", "WindSpeed", "above", 15.0),
+}
+
+
+def sorted_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    values = np.sort(df[column].to_numpy(dtype="float64"))
+    values.flags.writeable = False
+    return values
+
+
+def exceedance_counts(ordered: np.ndarray, thresholds: np.ndarray, direction: str) -> np.ndarray:
+    # One searchsorted over the sorted column answers every threshold at once:
+    # O((n + k) log n) for k thresholds instead of k full comparisons.
+    thresholds = np.asarray(thresholds, dtype="float64")
+    if direction == "above":
+        return len(ordered) - np.searchsorted(ordered, thresholds, side="right")
+    if direction == "below":
+        return np.searchsorted(ordered, thresholds, side="left")
+    raise ValueError(f"Unknown risk direction: {direction}")
+
+
+def threshold_grid(ordered: np.ndarray, points: int = RISK_GRID_POINTS) -> np.ndarray:
+    if len(ordered) == 0:
+        return np.empty(0)
+    return np.linspace(ordered[0], ordered[-1], points)
+
+
+def exceedance_curve(
+    ordered: np.ndarray, risk: RiskType, thresholds: np.ndarray | None = None
+) -> pd.DataFrame:
+    if thresholds is None:
+        thresholds = threshold_grid(ordered)
+    counts = exceedance_counts(ordered, thresholds, risk.direction)
+    total = max(len(ordered), 1)
+    return pd.DataFrame({"threshold": thresholds, "records": counts, "share": counts / total})
+
+
+def scan_risks(
+    df: pd.DataFrame, grids: dict[str, np.ndarray] | None = None
+) -> dict[str, pd.DataFrame]:
+    # Each column is sorted once and shared by the risk types that read it (flood/drought).
+    grids = grids or {}
+    ordered = {}
+    curves = {}
+    for name, risk in RISK_TYPES.items():
+        if risk.column not in ordered:
+            ordered[risk.column] = sorted_values(df, risk.column)
+        curves[name] = exceedance_curve(ordered[risk.column], risk, grids.get(name))
+    return curves
+
+
+EVENT_MIN_MONTHS = 3
+EVENT_COLUMNS = ["start", "end", "duration_months", "peak"]
+
+
+def _month_label(month_index: np.ndarray) -> list[str]:
+    return [f"{year}-{month:02d}" for year, month in zip(month_index // 12, month_index % 12 + 1)]
+
+
+def _monthly_series(
+    cube: pd.DataFrame, column: str, direction: str
+) -> tuple[np.ndarray, np.ndarray]:
+    # One value per (Year, Month) from the aggregate cube, already in time order. The
+    # month's extreme in the risk direction (max for "above", min for "below") is used,
+    # so a month is flagged exactly when one of its records is -- the same rows the
+    # exceedance counts see -- and event peaks are real observations, not means.
+    years = cube.index.get_level_values("Year").to_numpy(dtype="int64")
+    months = cube.index.get_level_values("Month").to_numpy(dtype="int64")
+    stat = "max" if direction == "above" else "min"
+    extremes = cube[stat][column].to_numpy(dtype="float64")
+    return years * 12 + (months - 1), extremes
+
+
+def find_runs(
+    month_index: np.ndarray,
+    values: np.ndarray,
+    flags: np.ndarray,
+    direction: str,
+    min_months: int = 1,
+) -> dict[str, np.ndarray]:
+    """Run-length encode flagged months into events; O(n), no per-row Python loop.
+
+    month_index must be strictly increasing; a run breaks on a missing month.
+    """
+    hits = np.flatnonzero(flags)
+    if len(hits) == 0:
+        empty = np.empty(0, dtype="int64")
+        return {"start": empty, "end": empty, "duration": empty, "peak": np.empty(0)}
+
+    hit_months = month_index[hits]
+    new_run = np.ones(len(hits), dtype=bool)
+    new_run[1:] = np.diff(hit_months) != 1
+    starts = np.flatnonzero(new_run)
+    ends = np.append(starts[1:], len(hits)) - 1
+    reduce = np.maximum if direction == "above" else np.minimum
+    peaks = reduce.reduceat(values[hits], starts)
+
+    keep = (ends - starts + 1) >= min_months
+    starts, ends, peaks = starts[keep], ends[keep], peaks[keep]
+    return {
+        "start": hit_months[starts],
+        "end": hit_months[ends],
+        "duration": ends - starts + 1,
+        "peak": peaks,
+    }
+
+
+def risk_flags(values: np.ndarray, risk: RiskType, threshold: float) -> np.ndarray:
+    return values > threshold if risk.direction == "above" else values < threshold
+
+
+def _events_frame(runs: dict[str, np.ndarray]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "start": _month_label(runs["start"]),
+            "end": _month_label(runs["end"]),
+            "duration_months": runs["duration"],
+            "peak": runs["peak"],
+        },
+        columns=EVENT_COLUMNS,
+    )
+
+
+def detect_events(
+    cube: pd.DataFrame, risk: RiskType, threshold: float, min_months: int = EVENT_MIN_MONTHS
+) -> pd.DataFrame:
+    month_index, values = _monthly_series(cube, risk.column, risk.direction)
+    runs = find_runs(
+        month_index, values, risk_flags(values, risk, threshold), risk.direction, min_months=min_months
+    )
+    return _events_frame(runs)
@@ -318,11 +318,11 @@ def init_session_state() -> None:
     defaults = {
         "logged_in": False,
         "user": None,
-        "active_df": None,
+        "active_frame": None,
         "active_dataset_id": None,
         "active_dataset_name": None,
         "active_dataset_source": None,
-        "last_upload_csv_text": None,
+        "last_upload_frame": None,
         "last_upload_dataset_name": None,
         "current_page": "Datasets",
         "logout_confirm": False,
@@ -332,7 +332,8 @@ def init_session_state() -> None:
         "model": None,
         "model_metrics": None,
         "model_feature_defaults": None,
-        "model_dataset_signature": None,
+        "model_dataset_fingerprint": None,
+        "batch_prediction": None,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
@@ -0,0 +1,23 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from modules import database  # noqa: E402
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def db_url(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        url = f"sqlite:///{tmp_path / 'earthscape.db'}"
+    else:
+        # Backends are cached per URL, so each test gets its own in-memory database.
+        url = f"memory://test-{uuid.uuid4().hex}"
+    monkeypatch.setenv("EARTHSCAPE_DB_URL", url)
+    database.init_db()
+    yield url
+    database.flush_performance_logs()
+    database.close_connections()
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.anomalies import ANOMALY_COLUMNS, DETECTORS, run_detector
+
+
+OUTLIER_ROW = 250
+
+
+def _frame(seed=3):
+    # Thirty years of seasonal monthly data, rows shuffled so detectors must map scores back
+    # to the input order, with one planted Temperature spike.
+    rng = np.random.default_rng(seed)
+    years = np.repeat(np.arange(1990, 2020), 12)
+    months = np.tile(np.arange(1, 13), 30)
+    season = np.sin((months - 1) / 12 * 2 * np.pi)
+    df = pd.DataFrame(
+        {
+            "Year": years,
+            "Month": months,
+            "Temperature": 15 + 8 * season + rng.normal(0, 0.5, 360),
+            "Rainfall": 40 - 20 * season + rng.normal(0, 1.0, 360),
+            "CO2": 400 + 0.15 * np.arange(360) + rng.normal(0, 0.2, 360),
+            "Humidity": 55 + rng.normal(0, 1.0, 360),
+            "WindSpeed": 5 + rng.normal(0, 0.3, 360),
+        }
+    )
+    df.loc[OUTLIER_ROW, "Temperature"] += 80
+    return df.sample(frac=1, random_state=seed)
+
+
+@pytest.mark.parametrize("name", sorted(DETECTORS))
+def test_detector_flags_the_planted_outlier(name):
+    df = _frame()
+    scores = run_detector(df, name, DETECTORS[name].param_default or None)
+    assert len(scores) == len(df)
+
+    thresholds = {col: 5.0 for col in ANOMALY_COLUMNS}
+    flagged = df.index[scores.mask(thresholds)].tolist()
+    assert flagged == [OUTLIER_ROW]
+
+    outlier_z = float(scores.z("Temperature")[df.index.get_loc(OUTLIER_ROW)])
+    assert scores.mask({**thresholds, "Temperature": outlier_z + 1}).sum() == 0
+    assert scores.flagged(df, thresholds).index.tolist() == [OUTLIER_ROW]
@@ -0,0 +1,167 @@
+import threading
+
+from modules import columnar, database
+
+
+def _columns():
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(
+        {
+            "Year": np.array([2020, 2020, 2021], dtype="int64"),
+            "Month": np.array([1, 2, 1], dtype="int64"),
+            "Temperature": [14.2, 15.1, 16.0],
+            "Rainfall": [10.0, 12.5, 8.25],
+            "CO2": [410.0, 411.5, 412.0],
+            "Humidity": [49.13, 50.0, 51.0],
+            "WindSpeed": [8.21, 7.5, 6.0],
+        }
+    )
+    return columnar.encode_frame(df)
+
+
+def test_users(db_url):
+    admin_id = database.create_user("admin", "hash", "admin", fullname="Admin")
+    analyst_id = database.create_user("ana", "hash", "analyst")
+
+    assert database.get_user_by_username("admin")["id"] == admin_id
+    assert database.get_user_by_id(analyst_id)["username"] == "ana"
+    assert [row["id"] for row in database.list_analysts()] == [analyst_id]
+    assert database.user_count() == 2
+
+    database.set_user_active(analyst_id, 0)
+    assert database.get_user_by_id(analyst_id)["is_active"] == 0
+
+
+def test_datasets_and_access(db_url):
+    admin_id = database.create_user("admin", "hash", "admin")
+    analyst_id = database.create_user("ana", "hash", "analyst")
+    columns = _columns()
+
+    first = database.insert_dataset("first.csv", admin_id, columns)
+    second = database.insert_dataset("copy.csv", admin_id, columns)
+    assert database.get_dataset_by_id(first)["content_hash"] == columnar.content_hash(columns)
+    assert columnar.decode_frame(database.list_dataset_columns(second))["Temperature"].tolist() == [
+        14.2,
+        15.1,
+        16.0,
+    ]
+    assert database.list_datasets_for_user(analyst_id, "analyst") == []
+
+    database.grant_dataset_access(first, analyst_id, admin_id)
+    assert [row["id"] for row in database.list_datasets_for_user(analyst_id, "analyst")] == [first]
+    assert [row["user_id"] for row in database.list_dataset_access(first)] == [analyst_id]
+
+    database.revoke_dataset_access(first, analyst_id)
+    assert database.list_datasets_for_user(analyst_id, "analyst") == []
+
+    database.delete_dataset(first)
+    assert database.get_dataset_by_id(first) is None
+    assert len(database.list_dataset_columns(second)) == len(columns)
+
+
+def test_feedback(db_url):
+    user_id = database.create_user("ana", "hash", "analyst")
+    feedback_id = database.insert_feedback(user_id, "Bug", "Chart is empty")
+
+    assert [row["id"] for row in database.list_feedback_for_user(user_id)] == [feedback_id]
+    database.update_feedback_status(feedback_id, "closed")
+    assert database.list_all_feedback()[0]["status"] == "closed"
+    database.delete_feedback(feedback_id)
+    assert database.list_all_feedback() == []
+
+
+def test_performance_logs(db_url):
+    user_id = database.create_user("ana", "hash", "analyst")
+    for ms in (1.0, 2.0, 3.0):
+        database.log_performance(user_id, "load_dataset_from_db", ms)
+
+    rows = database.list_performance_logs()
+    assert sorted(row["execution_time_ms"] for row in rows) == [1.0, 2.0, 3.0]
+    assert {row["username"] for row in rows} == {"ana"}
+
+
+def test_alerts(db_url):
+    admin_id = database.create_user("admin", "hash", "admin")
+    dataset_id = database.insert_dataset("first.csv", admin_id, _columns())
+    snapshot = {
+        "dataset_id": dataset_id,
+        "dataset_name": "first.csv",
+        "user_id": admin_id,
+        "summary_text": "Anomalies=1",
+        "temp_thresh": 2.0,
+        "rain_thresh": 2.0,
+        "co2_thresh": 2.0,
+        "humidity_thresh": 2.0,
+        "wind_thresh": 2.0,
+        "heatwave_threshold": 36.0,
+        "flood_threshold": 30.0,
+        "anomaly_count": 1,
+        "heatwave_count": 0,
+        "flood_count": 0,
+    }
+
+    database.insert_alert_snapshot(**snapshot)
+    assert database.insert_alert_snapshots([snapshot, {**snapshot, "anomaly_count": 2}]) == 2
+
+    history = database.list_alerts_for_dataset(dataset_id, "first.csv")
+    assert sorted(row["anomaly_count"] for row in history) == [1, 1, 2]
+    assert len(database.list_recent_alerts()) == 3
+
+
+def test_model_registry(db_url, monkeypatch):
+    columns = _columns()
+    saved_hash = columnar.content_hash(columns)
+    admin_id = database.create_user("admin", "hash", "admin")
+    dataset_id = database.insert_dataset("first.csv", admin_id, columns)
+
+    def register(content_hash):
+        return database.insert_model_artifact(
+            content_hash, "Year,Month", "linear_sufficient_stats", b"model", "{}", "{}"
+        )
+
+    assert register(saved_hash)
+    assert not register(saved_hash)
+    assert register("unsaved-upload")
+    assert database.get_model_artifact("unsaved-upload", "Year,Month", "linear_sufficient_stats") is not None
+
+    # Once the TTL has passed, the next insert prunes models whose content was never saved.
+    monkeypatch.setattr(database, "MODEL_ORPHAN_TTL_HOURS", -1.0)
+    assert register("another-upload")
+    assert database.get_model_artifact("unsaved-upload", "Year,Month", "linear_sufficient_stats") is None
+    assert database.get_model_artifact(saved_hash, "Year,Month", "linear_sufficient_stats") is not None
+
+    database.delete_dataset(dataset_id)
+    assert database.get_model_artifact(saved_hash, "Year,Month", "linear_sufficient_stats") is None
+
+
+def test_concurrent_writers_and_readers(db_url):
+    user_id = database.create_user("ana", "hash", "analyst")
+    errors = []
+
+    def write():
+        for i in range(150):
+            try:
+                database.insert_feedback(user_id, "Load", f"message {i}")
+                database.log_performance(user_id, "stress", float(i))
+            except Exception as ex:
+                errors.append(ex)
+
+    def read():
+        for _ in range(150):
+            try:
+                database.list_all_feedback()
+            except Exception as ex:
+                errors.append(ex)
+
+    threads = [threading.Thread(target=target) for target in (write, write, read, read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(database.list_all_feedback()) == 300
+    assert len(database.list_performance_logs(limit=1000)) == 300
+    assert database.performance_log_drop_count() == 0
@@ -0,0 +1,95 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from modules import aggregates, clean_frame, columnar
+from modules.clean_frame import build_clean_frame
+from modules.dataset_manager import ingest_csv_stream
+
+
+CSV = (
+    "Year,Month,Temperature,Rainfall,CO2,Humidity,WindSpeed\n"
+    "2018,1,14.2,30.72,410.13,51.85,3.3\n"
+    "2018,1,14.2,30.72,410.13,51.85,3.3\n"
+    "2018,2,15.1,12.5,411.2,49.9,4.1\n"
+)
+
+
+def _frame():
+    return build_clean_frame(
+        pd.DataFrame(
+            {
+                "Year": [2018, 2018, 2019],
+                "Month": [1, 2, 1],
+                "Temperature": [14.2, 15.1, 16.0],
+                "Rainfall": [30.72, 12.5, 8.0],
+                "CO2": [410.13, 411.2, 412.0],
+                "Humidity": [51.85, 49.9, 50.0],
+                "WindSpeed": [3.3, 4.1, 5.0],
+            }
+        )
+    )
+
+
+def test_derived_memo_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(clean_frame, "DERIVED_MAX_BYTES", 4000)
+    frame = _frame()
+    for i in range(10):
+        frame.derived(("scores", i), lambda: np.zeros(125))  # 1000 bytes each
+    assert frame.derived_bytes <= 4000
+    assert frame.peek_derived(("scores", 9)) is not None
+    assert frame.peek_derived(("scores", 0)) is None
+
+    # Results larger than the whole budget are returned but not memoized.
+    assert len(frame.derived("huge", lambda: np.zeros(1000))) == 1000
+    assert frame.peek_derived("huge") is None
+
+
+def test_kept_results_survive_cheap_entries(monkeypatch):
+    monkeypatch.setattr(clean_frame, "DERIVED_MAX_BYTES", 2000)
+    frame = _frame()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return pd.DataFrame({"rmse": [1.0]})
+
+    leaderboard = frame.derived("leaderboard", build, keep=True)
+    for i in range(20):
+        frame.derived(("preview_order", i), lambda: np.arange(100))
+    assert frame.derived("leaderboard", build, keep=True) is leaderboard
+    assert len(builds) == 1
+
+
+def test_fingerprint_matches_saved_blob_hash():
+    df, errors = ingest_csv_stream(io.BytesIO(CSV.encode("utf-8")))
+    assert not errors
+    columns = columnar.encode_frame(df)
+    frame = build_clean_frame(df)
+    reloaded = build_clean_frame(
+        columnar.decode_frame(
+            [
+                {"position": position, "column_name": name, "dtype": dtype, "data": data}
+                for position, name, dtype, data in columns
+            ]
+        )
+    )
+    assert frame.fingerprint == columnar.content_hash(columns)
+    assert reloaded.fingerprint == frame.fingerprint
+    assert str(frame.df["Temperature"].dtype) == "float32"
+
+
+def test_report_values_have_no_float32_noise():
+    df, _ = ingest_csv_stream(io.BytesIO(CSV.encode("utf-8")))
+    frame = build_clean_frame(df)
+    report = aggregates.monthly_means(frame.cube).to_csv(index=False)
+    assert "2018,1,14.2,30.72,410.13,51.85,3.3" in report.splitlines()
+
+
+def test_years_outside_int16_are_not_wrapped():
+    frame = build_clean_frame(_frame().df.astype("float64").assign(Year=[2018, 2018, 40000]))
+    assert frame.df["Year"].tolist() == [2018, 2018, 40000]
+    assert frame.year_bounds() == (2018, 40000)
+    assert len(frame.year_slice(40000, 40000)) == 1
+    assert str(_frame().df["Year"].dtype) == "int16"
@@ -0,0 +1,37 @@
+import io
+
+import pandas as pd
+
+from modules.dataset_manager import clean_and_validate_dataset, ingest_csv_stream
+
+
+CSV = (
+    "Year,Month,Temperature,Rainfall,CO2,Humidity,WindSpeed\n"
+    "2018,1,abc,1,2,3,4\n"
+    "2018,1,n/a?,1,2,3,4\n"
+    "2018,2,14.2,1,2,3,4\n"
+    "2018,2,14.2,1,2,3,4\n"
+    "2018,13,1,1,1,1,1\n"
+    "x,1,1,1,1,1,1\n"
+)
+
+
+def test_rows_differing_only_in_junk_text_are_kept():
+    cleaned, errors = ingest_csv_stream(io.BytesIO(CSV.encode("utf-8")))
+    assert errors == []
+    assert len(cleaned) == 3
+    assert cleaned["Temperature"].tolist() == [14.2, 14.2, 14.2]
+
+
+def test_upload_and_legacy_paths_clean_identically():
+    streamed, _ = ingest_csv_stream(io.BytesIO(CSV.encode("utf-8")), chunk_rows=2)
+    legacy, _ = ingest_csv_stream(io.StringIO(CSV))
+    in_memory, _ = clean_and_validate_dataset(pd.read_csv(io.StringIO(CSV)))
+    pd.testing.assert_frame_equal(streamed, legacy)
+    pd.testing.assert_frame_equal(streamed, in_memory)
+
+
+def test_missing_columns_are_reported():
+    cleaned, errors = ingest_csv_stream(io.StringIO("Year,Month\n2018,1\n"))
+    assert cleaned is None
+    assert errors == ["Missing required columns: Temperature, Rainfall, CO2, Humidity, WindSpeed"]
@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import frame_cache
+from modules.clean_frame import build_clean_frame
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(frame_cache, "_frames", OrderedDict())
+    monkeypatch.setattr(frame_cache, "_datasets", {})
+    monkeypatch.setattr(frame_cache, "_base_bytes", 0)
+
+
+def _frame(year: int):
+    return build_clean_frame(
+        pd.DataFrame(
+            {
+                "Year": [year] * 3,
+                "Month": [1, 2, 3],
+                "Temperature": [14.2, 15.1, 16.0],
+                "Rainfall": [30.72, 12.5, 8.0],
+                "CO2": [410.13, 411.2, 412.0],
+                "Humidity": [51.85, 49.9, 50.0],
+                "WindSpeed": [3.3, 4.1, 5.0],
+            }
+        )
+    )
+
+
+def test_identical_content_shares_one_frame():
+    first = frame_cache.put_frame(1, "v1", _frame(2018))
+    assert frame_cache.share_frame(_frame(2018)) is first
+    assert frame_cache.get_frame(2, first.fingerprint) is first
+
+
+def test_derived_results_count_towards_the_budget(monkeypatch):
+    old, new = frame_cache.share_frame(_frame(2018)), frame_cache.share_frame(_frame(2019))
+    base = frame_cache.cache_stats()["bytes"]
+    monkeypatch.setattr(frame_cache, "FRAME_CACHE_MAX_BYTES", base + 5000)
+
+    new.derived("scores", lambda: np.zeros(250))  # 2000 bytes: still fits
+    assert frame_cache.cache_stats()["entries"] == 2
+    # Over budget; evicting the older frame (least recently used) brings it back under.
+    png = b"x" * (3000 + frame_cache._frame_bytes(old) // 2)
+    new.derived("png", lambda: png)
+    stats = frame_cache.cache_stats()
+    assert stats["entries"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert frame_cache.share_frame(_frame(2019)) is new
+    assert frame_cache.share_frame(_frame(2018)) is not old
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from modules.linear_stats import LinearStats
+
+
+FEATURES = ["Year", "Month", "Rainfall"]
+TARGET = "Temperature"
+
+
+def _frame(rows=240, seed=7):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Year": rng.integers(1990, 2024, rows),
+            "Month": rng.integers(1, 13, rows),
+            "Rainfall": rng.gamma(2.0, 15.0, rows),
+        }
+    )
+    df[TARGET] = (
+        0.03 * df["Year"] - 0.4 * df["Month"] + 0.05 * df["Rainfall"] + rng.normal(0, 0.5, rows)
+    )
+    return df
+
+
+def test_merged_chunks_match_one_shot_statistics():
+    df = _frame()
+    one_shot = LinearStats.from_frame(df, FEATURES, TARGET)
+    chunked = LinearStats.empty(FEATURES, TARGET)
+    for start in range(0, len(df), 37):
+        chunked = chunked.update(df.iloc[start : start + 37])
+    halves = LinearStats.from_frame(df.iloc[:100], FEATURES, TARGET).merge(
+        LinearStats.from_frame(df.iloc[100:], FEATURES, TARGET)
+    )
+    for merged in (chunked, halves):
+        assert merged.count == one_shot.count
+        np.testing.assert_allclose(merged.mean, one_shot.mean)
+        np.testing.assert_allclose(merged.scatter, one_shot.scatter, rtol=1e-9)
+
+
+def test_solve_matches_sklearn_linear_regression():
+    df = _frame()
+    model = LinearStats.from_frame(df, FEATURES, TARGET).solve()
+    reference = LinearRegression().fit(df[FEATURES], df[TARGET])
+    np.testing.assert_allclose(model.coef_, reference.coef_, rtol=1e-8)
+    np.testing.assert_allclose(model.intercept_, reference.intercept_, rtol=1e-8)
+    np.testing.assert_allclose(model.predict(df), reference.predict(df[FEATURES]), rtol=1e-8)
+
+    extended = LinearStats.from_frame(df.iloc[:150], FEATURES, TARGET).solve().update(df.iloc[150:])
+    np.testing.assert_allclose(extended.coef_, reference.coef_, rtol=1e-8)
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from modules.preview import _sort_order, page_rows
+
+
+def test_text_columns_sort_with_missing_values_last():
+    df = pd.DataFrame({"Station": ["b", None, "a", 3, "c"]}, index=[10, 11, 12, 13, 14])
+    assert _sort_order(df, "Station", True).tolist() == [3, 2, 0, 4, 1]
+    assert _sort_order(df, "Station", False).tolist() == [4, 0, 2, 3, 1]
+    rows, total = page_rows(df, _sort_order(df, "Station", True), None, 1, 2)
+    assert total == 5
+    assert rows["Station"].tolist() == [3, "a"]
+
+
+def test_numeric_columns_sort_by_value():
+    df = pd.DataFrame({"Temperature": np.array([3.0, 1.0, 2.0], dtype="float32")})
+    assert _sort_order(df, "Temperature", True).tolist() == [1, 2, 0]
+    assert _sort_order(df, "Temperature", False).tolist() == [0, 2, 1]
@@ -0,0 +1,20 @@
+from modules import database
+
+
+def test_hot_queries_avoid_full_table_scans(tmp_path):
+    db_path = str(tmp_path / "earthscape.db")
+    database.init_db(db_path)
+    try:
+        assert database.find_full_table_scans(db_path) == {}
+    finally:
+        database.close_connections()
+
+
+def test_full_scan_detection_flags_unindexed_filters(tmp_path):
+    db_path = str(tmp_path / "earthscape.db")
+    database.init_db(db_path)
+    try:
+        with database.get_connection(db_path) as conn:
+            assert conn.full_scans("SELECT * FROM feedback WHERE message = ?", ("x",))
+    finally:
+        database.close_connections()
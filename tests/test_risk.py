@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pandas as pd
+
+from modules import risk
+from modules.clean_frame import build_clean_frame
+from modules.dataset_manager import ingest_csv_stream
+
+
+DATASETS = Path(__file__).resolve().parent.parent / "datasets"
+
+
+def _frame(temperatures, rainfall):
+    months = [month for month, values in enumerate(temperatures, start=1) for _ in values]
+    return build_clean_frame(
+        pd.DataFrame(
+            {
+                "Year": [2020] * len(months),
+                "Month": months,
+                "Temperature": [value for values in temperatures for value in values],
+                "Rainfall": [value for values in rainfall for value in values],
+                "CO2": [410.0] * len(months),
+                "Humidity": [50.0] * len(months),
+                "WindSpeed": [3.0] * len(months),
+            }
+        )
+    )
+
+
+def test_events_flag_months_with_any_record_beyond_threshold():
+    # Monthly means are 35, 35.5 and 36: none above 36, yet every month had a 40+ day.
+    frame = _frame([[40, 30], [41, 30], [42, 30]], [[10, 2], [10, 3], [10, 10]])
+    heatwaves = risk.detect_events(frame.cube, risk.RISK_TYPES["heatwave"], 36.0)
+    assert heatwaves.to_dict("records") == [
+        {"start": "2020-01", "end": "2020-03", "duration_months": 3, "peak": 42.0}
+    ]
+    droughts = risk.detect_events(frame.cube, risk.RISK_TYPES["drought"], 5.0, min_months=1)
+    assert droughts.to_dict("records") == [
+        {"start": "2020-01", "end": "2020-02", "duration_months": 2, "peak": 2.0}
+    ]
+
+
+def test_event_peak_is_an_observed_value():
+    df, errors = ingest_csv_stream(DATASETS / "new_dataset.csv")
+    assert not errors
+    frame = build_clean_frame(df)
+    events = risk.detect_events(frame.cube, risk.RISK_TYPES["heatwave"], -1.0, min_months=1)
+    assert len(events) == 1
+    assert events["peak"].iloc[0] == df["Temperature"].max() == -0.55